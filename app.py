@@ -5,6 +5,10 @@ from oauth2client.service_account import ServiceAccountCredentials
 import plotly.express as px
 from datetime import datetime
 import time
+import os
+from depolama import COL_OGRENCI, COL_FINANS, COL_LOG, COL_PROG, COL_ZIYARET, SAYFALAR, GSheetsMotoru, SQLiteMotoru, YazmaKuyrugu, HucreTamponu, ZiyaretSayaci, CakismaHatasi
+from olcum import Olcum, OlcumluMotor
+from veri import VeriOnbellek, VeriServisi, cerceve_kur, fark_yaz, kosullu_satir_guncelle, kosullu_satir_sil, satir_degerleri, kasa_ozeti, ogrenci_indeksi, zaman_cizelgesi_kur, zaman_sirala
 
 # --- AYARLAR ---
 st.set_page_config(page_title="Tennis App", page_icon="🎾", layout="wide")
@@ -45,9 +49,23 @@ st.markdown("""
 # --- YÖNETİCİ ŞİFRESİ ---
 ADMIN_SIFRE = "1234"
 
-# --- GOOGLE SHEETS BAĞLANTISI ---
+# --- ÖLÇÜM ---
+# API çağrıları, fonksiyonlar ve sayfa çizimleri süreç boyunca burada sayılır (📊 Tanılama)
+@st.cache_resource
+def olcum():
+    return Olcum()
+
+# --- DEPOLAMA BAĞLANTISI ---
+# Varsayılan Google Sheets; TENIS_DEPOLAMA=sqlite (veya secrets'ta depolama = "sqlite") ile yerel dosya
 @st.cache_resource
 def baglanti_kur():
+    with olcum().zamanla("fonksiyon", "-", "baglanti_kur"):
+        return OlcumluMotor(_motor_ac(), olcum())
+
+def _motor_ac():
+    secim = os.environ.get("TENIS_DEPOLAMA") or (st.secrets["depolama"] if "depolama" in st.secrets else "sheets")
+    if secim == "sqlite":
+        return SQLiteMotoru(os.environ.get("TENIS_DB", "courtmaster.db"), SAYFALAR)
     scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
     if "gcp_service_account" in st.secrets:
         creds_dict = dict(st.secrets["gcp_service_account"])
@@ -56,63 +74,130 @@ def baglanti_kur():
     else:
         creds = ServiceAccountCredentials.from_json_keyfile_name('secrets.json', scope)
     client = gspread.authorize(creds)
-    return client.open("CourtMaster_DB")
-
-# --- SÜTUN YAPILARI ---
-COL_OGRENCI = ["Ad Soyad", "Paket (Ders)", "Kalan Ders", "Son Islem", "Durum", "Odeme Durumu", "Notlar"]
-COL_FINANS = ["Tarih", "Ay", "Ogrenci", "Tutar", "Not", "Tip"]
-COL_LOG = ["Tarih", "Saat", "Ogrenci", "Islem", "Detay"]
-COL_PROG = ["Saat", "Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+    return GSheetsMotoru(client.open("CourtMaster_DB"))
 
 # --- VERİ ÇEKME (SAFE MODE) ---
-@st.cache_data(ttl=10)
+# Sayfa başına önbellek: bir sayfaya yazmak diğer sayfaların kaydını silmez. Değişiklikleri
+# veri_servisi() getirir; uzun TTL sadece servis takılırsa diye emniyet payı.
+ONBELLEK_TTL = 300 # sn
+
+@st.cache_resource
+def veri_onbellegi():
+    return VeriOnbellek(baglanti_kur(), ttl=ONBELLEK_TTL)
+
+# --- PAYLAŞILAN VERİ SERVİSİ ---
+# Tüm oturumlar için tek: SERVIS_ARALIK'ta bir ucuz revizyon sorgusu, sadece değişen sayfa okunur
+SERVIS_ARALIK = 10 # sn
+CANLI_SAYFALAR = ("🏠 Kort Paneli", "📝 Geçmiş") # veri değişince kendiliğinden yeniden çizilenler
+
+@st.cache_resource
+def veri_servisi():
+    return VeriServisi(veri_onbellegi(), SAYFALAR, aralik=SERVIS_ARALIK)
+
+@st.fragment(run_every=SERVIS_ARALIK)
+def canli_yenile():
+    # İstek atmaz: önbellekteki herhangi bir sayfa değiştiyse (nesil arttıysa) sayfayı baştan çizdirir
+    if veri_servisi().nesil != st.session_state.get("veri_nesli"): st.rerun()
+
 def get_data_cached(worksheet_name, expected_columns):
+    with olcum().zamanla("fonksiyon", worksheet_name, "get_data_cached"):
+        try: return veri_onbellegi().al(worksheet_name, expected_columns)
+        except: return cerceve_kur([], expected_columns, sayfa=worksheet_name)
+
+def son_kayitlar(worksheet_name, expected_columns, n):
+    # Sadece son n satır gereken yerler için (tüm sayfa çekilmez)
+    try: return veri_onbellegi().son(worksheet_name, expected_columns, n)
+    except: return cerceve_kur([], expected_columns, sayfa=worksheet_name)
+
+def ogrenci_kayitlari(worksheet_name, expected_columns, ogrenci, n, indeks="ogrenci", maske=None):
+    # Öğrencinin son n satırı; indeks veri sürümü başına bir kere kurulur, tüm sayfa taranmaz
     try:
-        sheet = baglanti_kur()
-        try:
-            ws = sheet.worksheet(worksheet_name)
-        except:
-            return pd.DataFrame(columns=expected_columns)
-            
-        all_values = ws.get_all_values()
-        if len(all_values) < 2: return pd.DataFrame(columns=expected_columns)
-        
-        data = all_values[1:]
-        clean_data = []
-        for row in data:
-            if len(row) >= len(expected_columns): clean_data.append(row[:len(expected_columns)])
-            else: clean_data.append(row + [None]*(len(expected_columns)-len(row)))
-                
-        df = pd.DataFrame(clean_data, columns=expected_columns)
-        
-        if "Tutar" in df.columns:
-            df["Tutar"] = df["Tutar"].astype(str).str.strip().str.replace(',', '.', regex=False)
-            df["Tutar"] = pd.to_numeric(df["Tutar"], errors='coerce').fillna(0)
-        if "Kalan Ders" in df.columns:
-            df["Kalan Ders"] = pd.to_numeric(df["Kalan Ders"], errors='coerce').fillna(0)
-        return df
-    except: return pd.DataFrame(columns=expected_columns)
+        idx, df = veri_onbellegi().turet(worksheet_name, expected_columns, indeks, *ogrenci_indeksi(maske))
+        return df.loc[idx.get(ogrenci, [])[-n:]].copy()
+    except: return cerceve_kur([], expected_columns, sayfa=worksheet_name)
+
+def get_data(worksheet_name, expected_columns):
+    # save_data farkı bu kopyaya göre çıkarır (satır sırası = sayfadaki sıra)
+    df = get_data_cached(worksheet_name, expected_columns)
+    st.session_state.setdefault("son_okunan", {})[worksheet_name] = df.copy()
+    return df
 
 def save_data(df, worksheet_name, columns):
-    sheet = baglanti_kur(); ws = sheet.worksheet(worksheet_name)
-    ws.clear(); ws.update([df.columns.values.tolist()] + df.values.tolist())
-    st.cache_data.clear()
+    with olcum().zamanla("fonksiyon", worksheet_name, "save_data"):
+        motor = baglanti_kur()
+        eski = st.session_state.get("son_okunan", {}).get(worksheet_name)
+        if eski is None or not df.index.is_unique or not eski.index.is_unique:
+            # Karşılaştıracak kopya yoksa eski yöntem: tüm sayfayı yeniden yaz
+            motor.yaz(worksheet_name, columns, [satir_degerleri(df, i, columns) for i in df.index])
+            st.session_state.get("son_okunan", {}).pop(worksheet_name, None)
+            veri_onbellegi().yaz(worksheet_name, df)
+            return
+        yeni_hal, degisti = fark_yaz(motor, worksheet_name, eski, df, columns)
+        st.session_state["son_okunan"][worksheet_name] = yeni_hal.copy()
+        if degisti: veri_onbellegi().yaz(worksheet_name, yeni_hal)
+
+# --- SATIR BAZLI GÜNCELLEME (İYİMSER EŞZAMANLILIK) ---
+# Koşullu yazma ve tekrar deneme veri.kosullu_satir_*'da; burada sadece önbelleğe işlenir
+def satir_guncelle(df, idx, worksheet_name, columns, degistir, deneme=3):
+    sonuc = kosullu_satir_guncelle(baglanti_kur(), worksheet_name, df, idx, columns, degistir, deneme)
+    if sonuc is None: return None
+    poz, hucreler, yeni = sonuc
+    veri_onbellegi().satir_yaz(worksheet_name, poz, hucreler)
+    return yeni
+
+def satir_sil(df, idx, worksheet_name, columns):
+    kosullu_satir_sil(baglanti_kur(), worksheet_name, df, idx, columns)
+    veri_onbellegi().gecersiz_kil(worksheet_name)
+
+# --- YAZMA KUYRUĞU ---
+# append_data satırları burada birikir; yenile() / sayfa sonu tek seferde gönderir
+def _gonderilenleri_isle(gonderilen):
+    # Gönderilen satırları önbelleğe yama olarak ekle, sayfayı baştan okutma
+    for sayfa, (poz, r) in gonderilen.items(): veri_onbellegi().satir_ekle(sayfa, r, poz)
+
+@st.cache_resource
+def yazma_kuyrugu():
+    return YazmaKuyrugu(baglanti_kur(), os.environ.get("TENIS_SPOOL", "yazma_kuyrugu.jsonl"),
+                        gonderildi=_gonderilenleri_isle)
 
 def append_data(row_data, worksheet_name, columns):
-    sheet = baglanti_kur(); ws = sheet.worksheet(worksheet_name)
-    clean_row = []
-    for x in row_data:
-        if isinstance(x, (int, float)): clean_row.append(x)
-        else: clean_row.append(str(x))
-    ws.append_row(clean_row)
-    st.cache_data.clear()
+    # Sadece kuyruğa ekleme süresi; gönderim motorda "ekle" olarak sayılır
+    with olcum().zamanla("fonksiyon", worksheet_name, "append_data"):
+        clean_row = []
+        for x in row_data:
+            if isinstance(x, (int, float)): clean_row.append(x)
+            else: clean_row.append(str(x))
+        yazma_kuyrugu().ekle(worksheet_name, clean_row)
+
+def yazmalari_gonder(ertele=False, gosterilen=None):
+    # Betikte tek deneme; kota beklemeli tekrarlar kuyruğun zamanlayıcısında.
+    # ertele: hemen rerun edilecekse uyarı bir sonraki çizimde gösterilir (yoksa görünmeden silinir).
+    # gosterilen: bu çizimin başında zaten gösterilen uyarı, aynısı tekrar basılmaz
+    try: yazma_kuyrugu().gonder(deneme=1, bekle=False)
+    except Exception as e:
+        uyari = f"Bazı kayıtlar henüz gönderilemedi, tekrar denenecek: {e}"
+        if ertele: st.session_state["yazma_uyarisi"] = uyari
+        elif uyari != gosterilen: st.warning(uyari)
+
+def yenile():
+    yazmalari_gonder(ertele=True); st.rerun()
+
+# --- HÜCRE TAMPONU (ÇİZELGE) ---
+@st.cache_resource
+def hucre_tamponu():
+    return HucreTamponu(baglanti_kur(), bekleme=1.5, yazildi=lambda sayfa, hucreler: veri_onbellegi().hucre_yaz(sayfa, hucreler))
 
 # --- 🕵️‍♂️ ZİYARETÇİ ---
+# Sadece bellekte sayılır; saatlik özetler arka planda Ziyaretci_Ozet sayfasına yazılır
+@st.cache_resource
+def ziyaret_sayaci():
+    return ZiyaretSayaci(yazma_kuyrugu())
+
+olcum().etiketle("Genel") # menü seçilene kadarki çağrılar
+
 if "ziyaret_kaydedildi" not in st.session_state:
     try:
-        tarih = datetime.now().strftime("%d-%m-%Y")
-        saat = datetime.now().strftime("%H:%M")
-        append_data([tarih, saat, "Misafir", "Giriş", "Sayfa Görüntülendi"], "Ders_Gecmisi", COL_LOG)
+        ziyaret_sayaci().kaydet()
         st.session_state["ziyaret_kaydedildi"] = True
     except: pass
 
@@ -125,56 +210,39 @@ with st.sidebar:
     IS_ADMIN = st.session_state.get("admin", False)
     
     if IS_ADMIN:
-        menu = st.radio("MENÜ", ["🏠 Kort Paneli", "📅 Çizelge", "👥 Sporcular", "💸 Kasa", "📝 Geçmiş"])
+        menu = st.radio("MENÜ", ["🏠 Kort Paneli", "📅 Çizelge", "👥 Sporcular", "💸 Kasa", "📝 Geçmiş", "📊 Tanılama"])
         
         # --- 🛠️ TAMİR BUTONU (SADECE ADMIN) ---
         st.markdown("---")
         if st.button("🔴 VERİTABANINI SIFIRLA VE KUR"):
             with st.spinner("Veritabanı onarılıyor... Lütfen bekleyin..."):
                 try:
-                    sheet = baglanti_kur()
-                    # 1. Ogrenci_Data
-                    try: sheet.del_worksheet(sheet.worksheet("Ogrenci_Data"))
-                    except: pass
-                    time.sleep(1.5) # API Kotası için bekleme
-                    ws1 = sheet.add_worksheet("Ogrenci_Data", 1000, 20)
-                    ws1.append_row(COL_OGRENCI)
-                    
-                    # 2. Finans_Kasa
-                    try: sheet.del_worksheet(sheet.worksheet("Finans_Kasa"))
-                    except: pass
-                    time.sleep(1.5)
-                    ws2 = sheet.add_worksheet("Finans_Kasa", 1000, 20)
-                    ws2.append_row(COL_FINANS)
-                    
-                    # 3. Ders_Gecmisi
-                    try: sheet.del_worksheet(sheet.worksheet("Ders_Gecmisi"))
-                    except: pass
-                    time.sleep(1.5)
-                    ws3 = sheet.add_worksheet("Ders_Gecmisi", 1000, 20)
-                    ws3.append_row(COL_LOG)
-                    
-                    # 4. Ders_Programi
-                    try: sheet.del_worksheet(sheet.worksheet("Ders_Programi"))
-                    except: pass
-                    time.sleep(1.5)
-                    ws4 = sheet.add_worksheet("Ders_Programi", 1000, 20)
-                    ws4.append_row(COL_PROG)
+                    motor = baglanti_kur()
                     saatler = [[f"{h:02d}:00"] + [""]*7 for h in range(8, 24)]
-                    ws4.append_rows(saatler)
+                    for ad, kolonlar in SAYFALAR.items():
+                        motor.kur(ad, kolonlar, saatler if ad == "Ders_Programi" else ())
                     
                     st.success("✅ Kurulum Başarıyla Tamamlandı! Sayfayı yenileyin.")
-                    st.cache_data.clear()
+                    veri_onbellegi().temizle()
                 except Exception as e:
                     st.error(f"Hata oluştu: {e}")
 
     else:
         menu = st.radio("MENÜ", ["🏠 Kort Paneli", "📅 Çizelge", "👥 Sporcular"])
 
-# Verileri Çek
-df_main = get_data_cached("Ogrenci_Data", COL_OGRENCI)
-df_finans = get_data_cached("Finans_Kasa", COL_FINANS)
-df_logs = get_data_cached("Ders_Gecmisi", COL_LOG)
+# Bu çalıştırmadaki API çağrıları seçili menüye yazılır; çizim süresi veri çekmeyi de kapsar
+olcum().etiketle(menu)
+cizim_baslangic = time.perf_counter()
+st.session_state["veri_nesli"] = veri_servisi().nesil # bu çizim bu nesli gösteriyor
+if menu in CANLI_SAYFALAR: canli_yenile()
+yazma_uyarisi = st.session_state.pop("yazma_uyarisi", None) # yenile()'den önceki çizimde kalan
+if yazma_uyarisi: st.warning(yazma_uyarisi)
+
+# Verileri Çek (Finans_Kasa / Ders_Gecmisi sadece gereken sayfada çekilir)
+df_main = get_data("Ogrenci_Data", COL_OGRENCI)
+GECMIS_PENCERE = 1000 # Geçmiş sayfasında okunacak son satır sayısı (gerektikçe ikiye katlanır)
+GECMIS_SAYFA = 50 # Her sekmede ilk gösterilen / "Daha Fazla" ile eklenen kayıt sayısı
+KASA_SAYFA = 50 # Kasa defterinde sayfa başına satır
 
 # --- İÇERİK ---
 if menu == "🏠 Kort Paneli":
@@ -210,23 +278,33 @@ if menu == "🏠 Kort Paneli":
                 with c1:
                     if st.button("✅ DERS TAMAMLANDI (-1)", type="primary"):
                         if kalan > 0:
-                            df_main.at[idx, "Kalan Ders"] -= 1
-                            df_main.at[idx, "Son Islem"] = datetime.now().strftime("%d-%m %H:%M")
-                            if df_main.at[idx, "Kalan Ders"] == 0: df_main.at[idx, "Durum"] = "Bitti"
-                            save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
-                            append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), sec, "Ders İşlendi", f"Kalan: {kalan-1}"], "Ders_Gecmisi", COL_LOG)
-                            st.rerun()
+                            def ders_dus(r):
+                                if r["Kalan Ders"] <= 0: return None
+                                r["Kalan Ders"] -= 1
+                                r["Son Islem"] = datetime.now().strftime("%d-%m %H:%M")
+                                if r["Kalan Ders"] == 0: r["Durum"] = "Bitti"
+                                return r
+                            try:
+                                yeni = satir_guncelle(df_main, idx, "Ogrenci_Data", COL_OGRENCI, ders_dus)
+                                if yeni: append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), sec, "Ders İşlendi", f"Kalan: {yeni['Kalan Ders']:.0f}"], "Ders_Gecmisi", COL_LOG)
+                                yenile()
+                            except CakismaHatasi as e: st.error(str(e))
                 with c2:
                     if st.button("↩️ GERİ (+1)"):
-                        df_main.at[idx, "Kalan Ders"] += 1
-                        save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
-                        append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), sec, "Geri Alındı", f"Kalan: {kalan+1}"], "Ders_Gecmisi", COL_LOG)
-                        st.rerun()
+                        def ders_geri(r):
+                            r["Kalan Ders"] += 1
+                            return r
+                        try:
+                            yeni = satir_guncelle(df_main, idx, "Ogrenci_Data", COL_OGRENCI, ders_geri)
+                            append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), sec, "Geri Alındı", f"Kalan: {yeni['Kalan Ders']:.0f}"], "Ders_Gecmisi", COL_LOG)
+                            yenile()
+                        except CakismaHatasi as e: st.error(str(e))
                 with c3:
                     if st.button("🗑️ SİL"):
-                        df_main = df_main.drop(idx)
-                        save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
-                        st.warning("Silindi"); time.sleep(1); st.rerun()
+                        try:
+                            satir_sil(df_main, idx, "Ogrenci_Data", COL_OGRENCI)
+                            st.warning("Silindi"); time.sleep(1); yenile()
+                        except CakismaHatasi as e: st.error(str(e))
     else: st.info("Kortta kimse yok.")
 
 elif menu == "👥 Sporcular":
@@ -256,31 +334,34 @@ elif menu == "👥 Sporcular":
                         if durum == "Aktif": dondur = st.checkbox("❄️ Kaydı Dondur")
                         else: dondur = st.checkbox("🔥 Kaydı Aktif Et", value=True)
                         if st.form_submit_button("KAYDET"):
-                            if ek > 0:
-                                df_main.at[idx, "Kalan Ders"] += ek
-                                append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), secilen, "Paket Eklendi", f"+{ek} Ders"], "Ders_Gecmisi", COL_LOG)
-                            if y_tutar > 0:
-                                append_data([datetime.now().strftime("%Y-%m-%d"), datetime.now().strftime("%Y-%m"), secilen, float(y_tutar), "Ödeme Alındı", "Gelir"], "Finans_Kasa", COL_FINANS)
-                                append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), secilen, "Ödeme", f"{y_tutar} TL"], "Ders_Gecmisi", COL_LOG)
-                                y_odeme = "Ödendi"
-                            df_main.at[idx, "Odeme Durumu"] = y_odeme
-                            df_main.at[idx, "Notlar"] = y_not
-                            if dondur and durum == "Aktif": df_main.at[idx, "Durum"] = "Donduruldu"
-                            elif dondur and durum == "Donduruldu": df_main.at[idx, "Durum"] = "Aktif"
-                            elif df_main.at[idx, "Kalan Ders"] > 0: df_main.at[idx, "Durum"] = "Aktif"
-                            save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
-                            st.success("Kaydedildi"); time.sleep(0.5); st.rerun()
+                            if y_tutar > 0: y_odeme = "Ödendi"
+                            def profil_kaydet(r):
+                                r["Kalan Ders"] += ek
+                                r["Odeme Durumu"] = y_odeme
+                                r["Notlar"] = y_not
+                                if dondur and durum == "Aktif": r["Durum"] = "Donduruldu"
+                                elif dondur and durum == "Donduruldu": r["Durum"] = "Aktif"
+                                elif r["Kalan Ders"] > 0: r["Durum"] = "Aktif"
+                                return r
+                            try:
+                                satir_guncelle(df_main, idx, "Ogrenci_Data", COL_OGRENCI, profil_kaydet)
+                                if ek > 0:
+                                    append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), secilen, "Paket Eklendi", f"+{ek} Ders"], "Ders_Gecmisi", COL_LOG)
+                                if y_tutar > 0:
+                                    append_data([datetime.now().strftime("%Y-%m-%d"), datetime.now().strftime("%Y-%m"), secilen, float(y_tutar), "Ödeme Alındı", "Gelir"], "Finans_Kasa", COL_FINANS)
+                                    append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), secilen, "Ödeme", f"{y_tutar} TL"], "Ders_Gecmisi", COL_LOG)
+                                st.success("Kaydedildi"); time.sleep(0.5); yenile()
+                            except CakismaHatasi as e: st.error(str(e))
                 with col_R:
                     st.markdown("#### 📜 Kişisel Geçmiş")
-                    logs = df_logs[df_logs["Ogrenci"]==secilen].copy(); logs["Tip"] = "Ders"
-                    fins = df_finans[(df_finans["Ogrenci"]==secilen) & (df_finans["Tip"]=="Gelir")].copy()
+                    logs = ogrenci_kayitlari("Ders_Gecmisi", COL_LOG, secilen, 10); logs["Tip"] = "Ders"
+                    fins = ogrenci_kayitlari("Finans_Kasa", COL_FINANS, secilen, 10, "ogrenci_gelir", lambda d: d["Tip"] == "Gelir")
                     if not fins.empty:
-                        fins["Tutar"] = pd.to_numeric(fins["Tutar"], errors='coerce').fillna(0)
-                        fins_fmt = pd.DataFrame({"Tarih": [str(x) for x in fins["Tarih"]], "Saat": ["-"]*len(fins), "Ogrenci": fins["Ogrenci"], "Islem": ["Ödeme"]*len(fins), "Detay": [f"{x:,.0f} TL" for x in fins["Tutar"]], "Tip": ["Para"]*len(fins)})
+                        fins_fmt = pd.DataFrame({"Tarih": [str(x) for x in fins["Tarih"]], "Saat": ["-"]*len(fins), "Ogrenci": fins["Ogrenci"], "Islem": ["Ödeme"]*len(fins), "Detay": [f"{x:,.0f} TL" for x in fins["Tutar"]], "Tip": ["Para"]*len(fins), "Zaman": fins["Zaman"]})
                         full_log = pd.concat([logs, fins_fmt], ignore_index=True)
                     else: full_log = logs
                     if not full_log.empty:
-                        full_log = full_log.iloc[::-1]
+                        full_log = zaman_sirala(full_log)
                         st.markdown('<div class="timeline-container">', unsafe_allow_html=True)
                         for _, r in full_log.head(10).iterrows():
                             cls = "t-money" if r.get("Tip")=="Para" else "t-lesson"
@@ -296,21 +377,24 @@ elif menu == "👥 Sporcular":
                 u = st.number_input("Peşinat (TL)", 0.0, step=100.0)
                 o = st.selectbox("Durum", ["Ödenmedi", "Ödendi"])
                 if st.form_submit_button("EKLE"):
-                    new_r = {"Ad Soyad": ad, "Paket (Ders)": p, "Kalan Ders": p, "Son Islem": "-", "Durum": "Aktif", "Odeme Durumu": o, "Notlar": "-"}
+                    new_r = {"Ad Soyad": ad, "Paket (Ders)": p, "Kalan Ders": p, "Son Islem": "-", "Durum": "Aktif", "Odeme Durumu": o, "Notlar": "-", "Surum": "1"}
                     df_main = pd.concat([df_main, pd.DataFrame([new_r])], ignore_index=True)
                     save_data(df_main, "Ogrenci_Data", COL_OGRENCI)
                     if u > 0:
                         append_data([datetime.now().strftime("%Y-%m-%d"), datetime.now().strftime("%Y-%m"), ad, float(u), "İlk Kayıt", "Gelir"], "Finans_Kasa", COL_FINANS)
                         append_data([datetime.now().strftime("%d-%m-%Y"), datetime.now().strftime("%H:%M"), ad, "Ödeme", f"{u} TL"], "Ders_Gecmisi", COL_LOG)
-                    st.success("Eklendi"); time.sleep(0.5); st.rerun()
-    else: st.dataframe(df_main, use_container_width=True)
+                    st.success("Eklendi"); time.sleep(0.5); yenile()
+    else: st.dataframe(df_main.drop(columns="Surum"), use_container_width=True)
 
 elif menu == "💸 Kasa":
     st.markdown("<h2 style='color: white;'>💸 Kasa</h2>", unsafe_allow_html=True)
     if IS_ADMIN:
+        # Toplamlar veri sürümü başına bir kere kurulur, yeni satırlar geldikçe üstüne eklenir
+        try: ozet, df_finans = veri_onbellegi().turet("Finans_Kasa", COL_FINANS, "kasa_ozeti", *kasa_ozeti())
+        except: ozet, df_finans = None, pd.DataFrame(columns=COL_FINANS)
         if not df_finans.empty:
-            gelir = df_finans[df_finans["Tip"]=="Gelir"]["Tutar"].sum()
-            gider = df_finans[df_finans["Tip"]=="Gider"]["Tutar"].sum()
+            gelir = ozet["tip"].get("Gelir", 0)
+            gider = ozet["tip"].get("Gider", 0)
             c1, c2, c3 = st.columns(3)
             c1.metric("GELİR", f"{gelir:,.0f} TL")
             c2.metric("GİDER", f"{gider:,.0f} TL")
@@ -325,51 +409,104 @@ elif menu == "💸 Kasa":
                     fa = st.text_input("Açıklama", "Genel")
                     if st.form_submit_button("EKLE"):
                         append_data([datetime.now().strftime("%Y-%m-%d"), datetime.now().strftime("%Y-%m"), "Genel", float(ft), fa, ftp], "Finans_Kasa", COL_FINANS)
-                        st.rerun()
+                        yenile()
             with col_graph:
-                gf = df_finans[df_finans["Tip"]=="Gelir"]
-                if not gf.empty:
+                if ozet["ogrenci"]:
+                    gf = pd.Series(ozet["ogrenci"], name="Tutar").rename_axis("Ogrenci").reset_index()
                     fig = px.pie(gf, values="Tutar", names="Ogrenci", title="Gelir Dağılımı", hole=0.4, color_discrete_sequence=px.colors.sequential.Greens_r)
                     fig.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0))
                     st.plotly_chart(fig, use_container_width=True)
-            st.dataframe(df_finans.sort_index(ascending=False), use_container_width=True)
+            st.markdown("#### 📅 Aylık Özet")
+            aylik = pd.Series(ozet["ay"], dtype=float).unstack(fill_value=0).reindex(columns=["Gelir", "Gider"], fill_value=0).sort_index(ascending=False)
+            aylik["Net"] = aylik["Gelir"] - aylik["Gider"]
+            st.dataframe(aylik, use_container_width=True)
+            st.markdown("#### 📒 Kasa Defteri")
+            n = len(df_finans); toplam_sayfa = max((n - 1) // KASA_SAYFA + 1, 1)
+            sayfa = st.number_input(f"Sayfa (toplam {toplam_sayfa})", 1, toplam_sayfa, 1, key="kasa_sayfa")
+            bas = n - sayfa * KASA_SAYFA
+            st.dataframe(df_finans.iloc[max(bas, 0):bas + KASA_SAYFA].iloc[::-1].drop(columns="Zaman"), use_container_width=True)
         else: st.info("Veri yok. Kasa boş.")
 
 elif menu == "📝 Geçmiş":
     st.markdown("<h2 style='color: white;'>📝 Geçmiş Kayıtlar</h2>", unsafe_allow_html=True)
-    logs = df_logs.copy(); logs["Tip"] = "Ders"
-    fins = df_finans.copy()
-    if not fins.empty:
-        fins["Tutar"] = pd.to_numeric(fins["Tutar"], errors='coerce').fillna(0)
-        fins_fmt = pd.DataFrame({"Tarih": [str(x) for x in fins["Tarih"]], "Saat": ["-"]*len(fins), "Ogrenci": fins["Ogrenci"], "Islem": [f"Finans: {x}" for x in fins["Tip"]], "Detay": [f"{x:,.0f} TL - {y}" for x, y in zip(fins["Tutar"], fins["Not"])], "Tip": ["Para" if t=="Gelir" else "Gider" for t in fins["Tip"]]})
-        master_log = pd.concat([logs, fins_fmt], ignore_index=True)
-    else: master_log = logs
-    master_log.loc[master_log["Ogrenci"] == "Misafir", "Tip"] = "Ziyaret"
+    pencere = st.session_state.get("gecmis_pencere", GECMIS_PENCERE)
+    logs = son_kayitlar("Ders_Gecmisi", COL_LOG, pencere)
+    fins = son_kayitlar("Finans_Kasa", COL_FINANS, pencere)
+    df_ziyaret = get_data_cached("Ziyaretci_Ozet", COL_ZIYARET)
+    # Birleşik akış ve HTML'i veri sürümü başına bir kere kurulur, tüm oturumlar paylaşır
+    ob = veri_onbellegi()
+    surumler = (ob.surum("Ders_Gecmisi"), ob.surum("Finans_Kasa"), ob.surum("Ziyaretci_Ozet"))
+    master_log = ob.surumlu(f"gecmis_{pencere}", surumler, lambda: zaman_cizelgesi_kur(logs, fins, df_ziyaret))
+    tumu_okundu = len(logs) < pencere and len(fins) < pencere
     if not master_log.empty:
-        master_log = master_log.iloc[::-1]
         tab_all, tab_ders, tab_finans, tab_sys = st.tabs(["Tümü", "🎾 Ders Hareketleri", "💰 Finans Raporu", "👀 Ziyaretçi Logu"])
-        def render_timeline(df_subset):
+        def daha_fazla(anahtar, mevcut):
+            st.session_state[f"gecmis_limit_{anahtar}"] = st.session_state.get(f"gecmis_limit_{anahtar}", GECMIS_SAYFA) + GECMIS_SAYFA
+            if st.session_state[f"gecmis_limit_{anahtar}"] > mevcut: st.session_state["gecmis_pencere"] = pencere * 2
+        def render_timeline(df_subset, anahtar):
             if df_subset.empty:
                 st.info("Bu kategoride kayıt yok.")
                 return
-            st.markdown('<div class="timeline-container">', unsafe_allow_html=True)
-            for _, r in df_subset.head(50).iterrows():
-                tip = r.get("Tip")
-                if tip == "Para": css = "t-money"; icon = "💰"
-                elif tip == "Gider": css = "t-sys"; icon = "📉"
-                elif tip == "Ziyaret": css = "t-sys"; icon = "👀"
-                else: css = "t-lesson"; icon = "🎾"
-                st.markdown(f"""<div class="timeline-item {css}"><span class="time-badge">{r['Tarih']} {r['Saat']}</span><div class="log-title">{icon} {r['Ogrenci']} - {r['Islem']}</div><div class="log-detail">{r['Detay']}</div></div>""", unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        with tab_all: render_timeline(master_log)
-        with tab_ders: render_timeline(master_log[(master_log["Tip"] == "Ders") & (master_log["Ogrenci"] != "Misafir")])
-        with tab_finans: render_timeline(master_log[master_log["Tip"].isin(["Para", "Gider"])])
-        with tab_sys: render_timeline(master_log[master_log["Tip"] == "Ziyaret"])
+            limit = st.session_state.get(f"gecmis_limit_{anahtar}", GECMIS_SAYFA)
+            st.markdown('<div class="timeline-container">' + "".join(df_subset["html"].head(limit)) + '</div>', unsafe_allow_html=True)
+            if len(df_subset) > limit or not tumu_okundu:
+                st.button("⬇️ Daha Fazla Göster", key=f"gecmis_daha_{anahtar}", on_click=daha_fazla, args=(anahtar, len(df_subset)))
+        with tab_all: render_timeline(master_log, "tumu")
+        with tab_ders: render_timeline(master_log[(master_log["Tip"] == "Ders") & (master_log["Ogrenci"] != "Misafir")], "ders")
+        with tab_finans: render_timeline(master_log[master_log["Tip"].isin(["Para", "Gider"])], "finans")
+        with tab_sys: render_timeline(master_log[master_log["Tip"] == "Ziyaret"], "ziyaret")
     else: st.info("Henüz bir hareketlilik yok.")
 
 elif menu == "📅 Çizelge":
+    # Önceki gönderim takıldıysa (örn. kota) bu çizimde bir kez daha dene; olmazsa zamanlayıcı dener
+    try: hucre_tamponu().tekrar_dene()
+    except Exception as e: st.warning(f"Çizelge değişiklikleri henüz kaydedilemedi, tekrar denenecek: {e}")
     df_prog = get_data_cached("Ders_Programi", COL_PROG)
     if IS_ADMIN:
-        ed = st.data_editor(df_prog, use_container_width=True, hide_index=True)
-        if not df_prog.equals(ed): save_data(df_prog, "Ders_Programi", COL_PROG)
+        st.data_editor(df_prog, use_container_width=True, hide_index=True, key="cizelge")
+        # Sadece bu çizimde düzenlenen (saat, gün) hücreleri: edited_rows bir önceki çizimdekiyle
+        # karşılaştırılır. (Anahtarlı editör düzenlemeleri veri değişse de tutar; eski bir düzenleme
+        # başka birinin sonradan yazdığının üstüne tekrar gönderilmez.) Hızlı düzenlemeler tamponda birleşir.
+        onceki = st.session_state.get("cizelge_onceki", {})
+        duzenlenen = st.session_state["cizelge"]["edited_rows"]
+        for poz, degisen in duzenlenen.items():
+            for kolon, deger in degisen.items():
+                if onceki.get(poz, {}).get(kolon, object()) != deger:
+                    hucre_tamponu().ekle("Ders_Programi", int(poz), COL_PROG.index(kolon), "" if deger is None else str(deger))
+        st.session_state["cizelge_onceki"] = {poz: dict(d) for poz, d in duzenlenen.items()}
+        if hucre_tamponu().bekleyen(): st.caption("💾 Değişiklikler birkaç saniye içinde kaydedilecek...")
     else: st.dataframe(df_prog, use_container_width=True)
+
+elif menu == "📊 Tanılama":
+    st.markdown("<h2 style='color: white;'>📊 Tanılama</h2>", unsafe_allow_html=True)
+    if IS_ADMIN:
+        o = olcum()
+        st.caption(f"{datetime.fromtimestamp(o.baslangic).strftime('%d-%m-%Y %H:%M')} tarihinden beri · süreler ms, p50/p95 histogram kovasının üst sınırı")
+        st.markdown("#### 🖥️ Sayfa Çizim Süreleri")
+        st.dataframe(pd.DataFrame(o.ozet("cizim", ["menu"])).drop(columns=["giden_kb", "gelen_kb"], errors="ignore"), use_container_width=True, hide_index=True)
+        st.markdown("#### 🔌 API Çağrıları")
+        grup = st.radio("Grupla", ["Menü", "Sayfa / İşlem", "Menü / Sayfa / İşlem"], horizontal=True)
+        alanlar = {"Menü": ["menu"], "Sayfa / İşlem": ["sayfa", "islem"], "Menü / Sayfa / İşlem": ["menu", "sayfa", "islem"]}[grup]
+        st.dataframe(pd.DataFrame(o.ozet("api", alanlar)), use_container_width=True, hide_index=True)
+        st.markdown("#### ⚙️ Veri Fonksiyonları")
+        st.dataframe(pd.DataFrame(o.ozet("fonksiyon", ["sayfa", "fonksiyon"])).drop(columns=["giden_kb", "gelen_kb"], errors="ignore"), use_container_width=True, hide_index=True)
+        st.markdown("#### 🗃️ Önbellek")
+        sayaclar = veri_onbellegi().sayaclar()
+        ob_df = pd.DataFrame(sayaclar).T.reindex(columns=["isabet", "iska", "artimli", "yama", "gecersiz"]).fillna(0).astype(int)
+        ob_df["isabet_orani"] = (ob_df["isabet"] / (ob_df["isabet"] + ob_df["iska"]).where(lambda s: s > 0)).round(2)
+        st.dataframe(ob_df, use_container_width=True)
+        st.markdown("#### 🛰️ Veri Servisi")
+        servis = veri_servisi().sayaclar()
+        s1, s2, s3, s4 = st.columns(4)
+        s1.metric("Kontrol", servis["kontrol"]); s2.metric("Değişiklik", servis["degisiklik"])
+        s3.metric("Hata", servis["hata"]); s4.metric("Nesil", servis["nesil"])
+        if veri_servisi().son_kontrol: st.caption(f"Son kontrol: {datetime.fromtimestamp(veri_servisi().son_kontrol).strftime('%H:%M:%S')} · her {SERVIS_ARALIK} sn")
+        c1, c2 = st.columns(2)
+        c1.download_button("⬇️ Metrikleri İndir (Prometheus)", o.prometheus(sayaclar, servis), file_name="courtmaster_metrikler.prom", mime="text/plain")
+        if c2.button("🔄 Ölçümleri Sıfırla"): o.sifirla(); yenile()
+
+# Çizim süresi (yenile() ile yarıda kesilen çalıştırmalar sayılmaz)
+olcum().kaydet("cizim", (), (time.perf_counter() - cizim_baslangic) * 1000)
+
+# Sıradaki yazmaları gönder (yenile() ile bitmeyen çalıştırmalar için)
+yazmalari_gonder(gosterilen=yazma_uyarisi)
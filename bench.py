@@ -0,0 +1,339 @@
+# --- ÇEVRİMDIŞI BENCHMARK ---
+# Google'a gitmeden uygulamanın sıcak yollarını ölçer: gspread yerine bellekte çalışan sahte bir
+# sunucu (ayarlanabilir gecikme + kota hatası) ve sentetik kulüp verisi kullanılır. Her işlem için
+# medyan süre, API çağrı sayısı, aktarılan bayt ve tepe bellek raporlanır.
+#
+#   python bench.py                                   # 100 öğrenci/10k kayıt ve 1000/100k
+#   python bench.py --boyut 10000:1000000 --tekrar 3  # büyük kulüp
+#   python bench.py --gecikme 80 --kota 25 --json sonuc.json
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+from depolama import COL_OGRENCI, COL_FINANS, COL_LOG, COL_PROG, COL_ZIYARET, SAYFALAR, GSheetsMotoru, YazmaKuyrugu
+from veri import VeriOnbellek, VeriServisi, cerceve_kur, fark_yaz, kasa_ozeti, ogrenci_indeksi, zaman_cizelgesi_kur
+
+# --- SAHTE GSPREAD ---
+class SahteYanit:
+    status_code = 429
+
+class SahteKotaHatasi(Exception):
+    def __init__(self):
+        super().__init__("APIError: [429]: Quota exceeded (sahte)")
+        self.response = SahteYanit()
+
+class SahteIzgaraYaniti:
+    # Sheets'in ızgara dışı aralık yanıtı; gspread bundan APIError kurar
+    status_code = 400
+    def __init__(self, mesaj): self.text, self._mesaj = mesaj, mesaj
+    def json(self): return {"error": {"code": 400, "message": self._mesaj, "status": "INVALID_ARGUMENT"}}
+
+# Dosyanın değişme zamanını (Drive modifiedTime) ilerleten istekler
+YAZMALAR = {"append_rows", "batch_update", "delete_rows", "update", "clear", "add_worksheet", "del_worksheet"}
+
+class SahteSunucu:
+    # Tüm sahte sayfaların paylaştığı istek sayacı; her istek gecikir, her `kota_her`. istek 429 döner
+    def __init__(self, gecikme=0.0, kota_her=0):
+        self.gecikme = gecikme
+        self.kota_her = kota_her
+        self.cagri = Counter()
+        self.bayt = 0
+        self.revizyon = 0
+        self._n = 0
+
+    def istek(self, ad, veri=None):
+        self._n += 1
+        if self.gecikme: time.sleep(self.gecikme)
+        if self.kota_her and self._n % self.kota_her == 0:
+            self.cagri["kota_hatasi"] += 1
+            raise SahteKotaHatasi()
+        self.cagri[ad] += 1
+        if ad in YAZMALAR: self.revizyon += 1
+        if veri is not None: self.bayt += len(repr(veri))
+        return veri
+
+    @contextmanager
+    def sakin(self):
+        # Hazırlık adımları gecikme/kota hatası görmesin
+        eski, self.gecikme, self.kota_her = (self.gecikme, self.kota_her), 0, 0
+        try: yield
+        finally: self.gecikme, self.kota_her = eski
+
+def _metin(x):
+    # Sheets sayıları biçimlendirilmiş metin olarak geri verir (250.0 -> "250")
+    if isinstance(x, float) and x.is_integer(): return str(int(x))
+    return "" if x is None else str(x)
+
+def _aralik(a1):
+    # "A5:H5", "C7", "A5:H" -> (satır1, sütun1, satır2 | None, sütun2)
+    bas, _, son = a1.partition(":")
+    r1, c1 = a1_to_rowcol(bas)
+    if not son: return r1, c1, r1, c1
+    if re.fullmatch(r"[A-Z]+", son): return r1, c1, None, a1_to_rowcol(son + "1")[1]
+    r2, c2 = a1_to_rowcol(son)
+    return r1, c1, r2, c2
+
+def _kirp(satir):
+    while satir and satir[-1] == "": satir = satir[:-1]
+    return satir
+
+class SahteSayfa:
+    def __init__(self, sunucu, baslik, satirlar):
+        self.s, self.title, self.v = sunucu, baslik, [list(map(_metin, r)) for r in satirlar]
+        self.row_count = max(1000, len(self.v)) # yeni sayfa 1000 satır; eklemeler sonunu büyütür
+
+    @property
+    def col_count(self): return max((len(r) for r in self.v), default=0)
+
+    def get_all_values(self):
+        return self.s.istek("get_all_values", [list(r) for r in self.v])
+
+    def get_values(self, a1):
+        r1, c1, r2, c2 = _aralik(a1)
+        if r1 > self.row_count:
+            self.s.istek("get_values")
+            raise APIError(SahteIzgaraYaniti(f"Range ('{self.title}'!{a1}) exceeds grid limits. "
+                                             f"Max rows: {self.row_count}, max columns: 26"))
+        return self.s.istek("get_values", [r[c1-1:c2] for r in self.v[r1-1:r2]])
+
+    def col_values(self, k):
+        return self.s.istek("col_values", _kirp([r[k-1] if len(r) >= k else "" for r in self.v]))
+
+    def row_values(self, r):
+        return self.s.istek("row_values", _kirp(list(self.v[r-1])) if r <= len(self.v) else [])
+
+    def append_row(self, satir): self.append_rows([satir])
+
+    def append_rows(self, satirlar):
+        self.s.istek("append_rows", satirlar)
+        ilk = len(self.v) + 1
+        self.v.extend([list(map(_metin, r)) for r in satirlar])
+        self.row_count = max(self.row_count, len(self.v))
+        son = rowcol_to_a1(len(self.v), max(len(r) for r in satirlar))
+        return {"updates": {"updatedRange": f"'{self.title}'!A{ilk}:{son}"}}
+
+    def batch_update(self, veri):
+        self.s.istek("batch_update", veri)
+        for d in veri:
+            r1, c1, _, _ = _aralik(d["range"])
+            for i, satir in enumerate(d["values"]):
+                while len(self.v) < r1 + i: self.v.append([])
+                hedef = self.v[r1 + i - 1]
+                hedef.extend([""] * (c1 - 1 + len(satir) - len(hedef)))
+                hedef[c1-1:c1-1+len(satir)] = map(_metin, satir)
+
+    def delete_rows(self, r):
+        self.s.istek("delete_rows")
+        del self.v[r-1]
+        self.row_count -= 1
+
+    def update(self, degerler):
+        self.s.istek("update", degerler)
+        self.v = [list(map(_metin, r)) for r in degerler]
+        self.row_count = max(self.row_count, len(self.v))
+
+    def clear(self):
+        self.s.istek("clear")
+        self.v = []
+
+class SahteTablo:
+    # gspread.Spreadsheet yerine; GSheetsMotoru bunu gerçeğinden ayırt etmez
+    def __init__(self, sunucu, sayfalar):
+        self.s = sunucu
+        self.sayfalar = {ad: SahteSayfa(sunucu, ad, satirlar) for ad, satirlar in sayfalar.items()}
+
+    def worksheet(self, ad):
+        self.s.istek("worksheet")
+        if ad not in self.sayfalar: raise WorksheetNotFound(ad)
+        return self.sayfalar[ad]
+
+    def add_worksheet(self, ad, satir, sutun):
+        self.s.istek("add_worksheet")
+        self.sayfalar[ad] = SahteSayfa(self.s, ad, [])
+        return self.sayfalar[ad]
+
+    def del_worksheet(self, ws):
+        self.s.istek("del_worksheet")
+        self.sayfalar.pop(ws.title, None)
+
+    def get_lastUpdateTime(self):
+        return self.s.istek("get_lastUpdateTime", str(self.s.revizyon))
+
+# --- SENTETİK KULÜP VERİSİ ---
+def veri_uret(ogrenci, kayit, tohum=42):
+    rnd = random.Random(tohum)
+    adlar = [f"Sporcu {i:05d}" for i in range(ogrenci)]
+    gunler = [f"{g:02d}-{a:02d}-{y}" for y in (2024, 2025, 2026) for a in range(1, 13) for g in range(1, 29)]
+    ogr = [[ad, "10", str(rnd.randint(0, 10)), "-", rnd.choice(["Aktif", "Aktif", "Bitti", "Donduruldu"]),
+            rnd.choice(["Ödendi", "Ödenmedi"]), "-", "1"] for ad in adlar]
+    logs, fins = [], []
+    for i in range(kayit):
+        gun = gunler[i * len(gunler) // kayit]
+        g, a, y = gun.split("-")
+        ad = rnd.choice(adlar)
+        logs.append([gun, f"{rnd.randint(8, 22):02d}:{rnd.choice(['00', '30'])}", ad,
+                     rnd.choice(["Ders İşlendi", "Ders İşlendi", "Paket Eklendi", "Ödeme", "Geri Alındı"]), f"Kalan: {rnd.randint(0, 10)}"])
+        tip = "Gelir" if rnd.random() < 0.85 else "Gider"
+        fins.append([f"{y}-{a}-{g}", f"{y}-{a}", ad if tip == "Gelir" else "Genel",
+                     str(rnd.choice([500, 750, 1000, 1500, 2000])), "Ödeme Alındı" if tip == "Gelir" else "Gider", tip])
+    prog = [[f"{h:02d}:00"] + [rnd.choice(["", "", adlar[0]]) for _ in range(7)] for h in range(8, 24)]
+    ziy = [[gunler[-1], f"{h:02d}:00", str(rnd.randint(1, 40))] for h in range(8, 24)]
+    return {"Ogrenci_Data": ogr, "Finans_Kasa": fins, "Ders_Gecmisi": logs, "Ders_Programi": prog, "Ziyaretci_Ozet": ziy}
+
+# --- ÖLÇÜM ---
+def olc(sunucu, hazirla, tekrar):
+    # hazirla() ölçülecek çağrıyı döner (hazırlık süresi ölçüme girmez). Okumalarda kota hatası
+    # uygulamadaki gibi yukarı çıkar; burada sayılır ve o tekrar süreye katılmaz.
+    sureler, cagri, bayt, hata = [], Counter(), 0, 0
+    for _ in range(tekrar):
+        with sunucu.sakin(): is_ = hazirla()
+        c0, b0 = Counter(sunucu.cagri), sunucu.bayt
+        t0 = time.perf_counter()
+        try: is_()
+        except SahteKotaHatasi: hata += 1; continue
+        sureler.append((time.perf_counter() - t0) * 1000)
+        cagri, bayt = sunucu.cagri - c0, sunucu.bayt - b0
+    with sunucu.sakin(): is_ = hazirla()
+    tracemalloc.start()
+    try: is_()
+    except SahteKotaHatasi: pass
+    tepe = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    return {"ms": statistics.median(sureler) if sureler else float("nan"), "hata": hata,
+            "api": sum(v for k, v in cagri.items() if k not in ("worksheet", "kota_hatasi")),
+            "cagrilar": dict(cagri), "kb": bayt / 1024, "tepe_mb": tepe / 2**20}
+
+def senaryo(ogrenci, kayit, tekrar, gecikme, kota_her, pencere=1000):
+    veri = veri_uret(ogrenci, kayit)
+    sunucu = SahteSunucu()
+    tablo = SahteTablo(sunucu, {ad: [SAYFALAR[ad]] + satirlar for ad, satirlar in veri.items()})
+    motor = GSheetsMotoru(tablo, kota_bekleme=0)
+    ob = VeriOnbellek(motor, ttl=3600)
+    for ad, kol in SAYFALAR.items(): ob.al(ad, kol) # sıcak önbellek
+    sunucu.gecikme, sunucu.kota_her = gecikme, kota_her
+    spool = os.path.join(tempfile.mkdtemp(), "spool.jsonl")
+    kuyruk = YazmaKuyrugu(motor, spool, pencere=0, bekleme=0.01,
+                          gonderildi=lambda g: [ob.satir_ekle(s, r, poz) for s, (poz, r) in g.items()])
+    rnd = random.Random(7)
+    ad_sec = lambda: veri["Ogrenci_Data"][rnd.randrange(ogrenci)][0]
+    sonuc = []
+    def ekle(sayfa, islem, hazirla): sonuc.append({"sayfa": sayfa, "islem": islem, **olc(sunucu, hazirla, tekrar)})
+
+    # Genel: soğuk yükleme (TTL dolmuş, hiç önbellek yok)
+    def soguk():
+        o = VeriOnbellek(motor)
+        return lambda: [o.al(ad, SAYFALAR[ad]) for ad in ("Ogrenci_Data", "Finans_Kasa", "Ders_Gecmisi")]
+    ekle("Genel", "soğuk yükleme (3 sayfa, get_all_values + parse)", soguk)
+    def artimli():
+        o = VeriOnbellek(motor, ttl=0); o.al("Ders_Gecmisi", COL_LOG)
+        s = tablo.sayfalar["Ders_Gecmisi"] # sayaçlara girmesin diye doğrudan
+        s.v.extend([list(r) for r in veri["Ders_Gecmisi"][:100]]); s.row_count = max(s.row_count, len(s.v))
+        return lambda: o.al("Ders_Gecmisi", COL_LOG)
+    ekle("Genel", "TTL sonrası artımlı okuma (+100 satır)", artimli)
+    ekle("Genel", "önbellek isabeti (Ogrenci_Data)", lambda: lambda: ob.al("Ogrenci_Data", COL_OGRENCI))
+
+    # Kort Paneli
+    def ders_dus():
+        df = ob.al("Ogrenci_Data", COL_OGRENCI); poz = rnd.randrange(len(df)); r = df.iloc[poz]
+        yeni = [r[c] if c != "Kalan Ders" else int(r[c]) - 1 for c in COL_OGRENCI]; yeni[-1] = str(int(float(r["Surum"] or 0)) + 1)
+        def is_():
+            motor.kosullu_guncelle("Ogrenci_Data", poz, yeni, {0: r["Ad Soyad"], 7: r["Surum"]})
+            ob.satir_yaz("Ogrenci_Data", poz, yeni)
+            kuyruk.ekle("Ders_Gecmisi", ["18-10-2026", "10:00", r["Ad Soyad"], "Ders İşlendi", "Kalan: 1"]); kuyruk.gonder()
+        return is_
+    ekle("Kort Paneli", "DERS TAMAMLANDI (-1): koşullu satır + log", ders_dus)
+    def fark():
+        eski = ob.al("Ogrenci_Data", COL_OGRENCI); yeni = eski.copy(); yeni.iat[rnd.randrange(len(yeni)), 2] += 1
+        return lambda: fark_yaz(motor, "Ogrenci_Data", eski, yeni, COL_OGRENCI)
+    ekle("Kort Paneli", "save_data farkı (1 satır)", fark)
+    def tam_yaz():
+        df = ob.al("Ogrenci_Data", COL_OGRENCI)
+        satirlar = df.astype(str).values.tolist()
+        return lambda: motor.yaz("Ogrenci_Data", COL_OGRENCI, satirlar)
+    ekle("Kort Paneli", "eski save_data: clear + tüm sayfa", tam_yaz)
+
+    # Sporcular
+    def profil_eski():
+        logs, fins = ob.al("Ders_Gecmisi", COL_LOG), ob.al("Finans_Kasa", COL_FINANS); ad = ad_sec()
+        return lambda: (logs[logs["Ogrenci"] == ad].tail(10), fins[(fins["Ogrenci"] == ad) & (fins["Tip"] == "Gelir")].tail(10))
+    ekle("Sporcular", "profil geçmişi: maske taraması (eski)", profil_eski)
+    def indeks_kur():
+        ob.gecersiz_kil("Ders_Gecmisi")
+        return lambda: ob.turet("Ders_Gecmisi", COL_LOG, "ogrenci", *ogrenci_indeksi())
+    ekle("Sporcular", "öğrenci indeksi kur (soğuk)", indeks_kur)
+    def profil():
+        ad = ad_sec()
+        def is_():
+            idx, df = ob.turet("Ders_Gecmisi", COL_LOG, "ogrenci", *ogrenci_indeksi())
+            return df.loc[idx.get(ad, [])[-10:]]
+        return is_
+    ekle("Sporcular", "profil geçmişi: indeksli", profil)
+
+    # Kasa
+    def kasa_eski():
+        df = ob.al("Finans_Kasa", COL_FINANS)
+        return lambda: (df[df["Tip"] == "Gelir"]["Tutar"].sum(), df[df["Tip"] == "Gider"]["Tutar"].sum(), df.sort_index(ascending=False))
+    ekle("Kasa", "toplamlar: filtre + sıralama (eski)", kasa_eski)
+    ekle("Kasa", "toplamlar: artımlı özet", lambda: lambda: ob.turet("Finans_Kasa", COL_FINANS, "kasa_ozeti", *kasa_ozeti()))
+    def kasa_ekle():
+        satir = ["2026-10-18", "2026-10", ad_sec(), 500.0, "Ödeme Alındı", "Gelir"]
+        return lambda: (kuyruk.ekle("Finans_Kasa", satir), kuyruk.gonder(), ob.turet("Finans_Kasa", COL_FINANS, "kasa_ozeti", *kasa_ozeti()))
+    ekle("Kasa", "Hızlı Ekle + özet güncelle", kasa_ekle)
+
+    # Geçmiş
+    def gecmis():
+        logs, fins = ob.son("Ders_Gecmisi", COL_LOG, pencere), ob.son("Finans_Kasa", COL_FINANS, pencere)
+        ziy = ob.al("Ziyaretci_Ozet", COL_ZIYARET)
+        return lambda: "".join(zaman_cizelgesi_kur(logs, fins, ziy)["html"].head(50))
+    ekle("Geçmiş", f"zaman çizelgesi kur + 50 satır HTML (pencere {pencere})", gecmis)
+    def son_soguk():
+        o = VeriOnbellek(motor)
+        return lambda: o.son("Ders_Gecmisi", COL_LOG, pencere)
+    ekle("Geçmiş", f"son {pencere} satır okuma (soğuk)", son_soguk)
+
+    # Çizelge
+    ekle("Çizelge", "5 hücre düzenleme (tek batch)", lambda: lambda: motor.hucre_guncelle("Ders_Programi", [(i, 1 + i, "X") for i in range(5)]))
+
+    # Paylaşılan veri servisi: tek kontrol turu (döngü beklemede, turlar elle)
+    servis = VeriServisi(ob, SAYFALAR, aralik=10**9)
+    with sunucu.sakin(): servis.kontrol() # ilk tur: başlangıç revizyonları
+    ekle("Servis", "değişiklik kontrolü (değişiklik yok)", lambda: servis.kontrol)
+    def dis_ekleme():
+        tablo.sayfalar["Ders_Gecmisi"].append_rows([veri["Ders_Gecmisi"][0]])
+        return servis.kontrol
+    ekle("Servis", "başka tabletten 1 log satırı (tazeleme)", dis_ekleme)
+
+    bellek = {ad: ob.al(ad, kol).memory_usage(deep=True).sum() / 2**20 for ad, kol in SAYFALAR.items()}
+    return {"ogrenci": ogrenci, "kayit": kayit, "sonuc": sonuc, "bellek_mb": bellek, "cagrilar": dict(sunucu.cagri)}
+
+def yazdir(s):
+    print(f"\n=== {s['ogrenci']:,} öğrenci / {s['kayit']:,} log + finans kaydı ===")
+    print(f"{'sayfa':<12} {'işlem':<52} {'ms':>10} {'api':>4} {'KB':>10} {'tepe MB':>8} {'hata':>5}")
+    for r in s["sonuc"]:
+        print(f"{r['sayfa']:<12} {r['islem']:<52} {r['ms']:>10.2f} {r['api']:>4} {r['kb']:>10.1f} {r['tepe_mb']:>8.1f} {r['hata']:>5}")
+    print("DataFrame belleği (MB): " + ", ".join(f"{ad} {mb:.1f}" for ad, mb in s["bellek_mb"].items()))
+    if s["cagrilar"].get("kota_hatasi"): print(f"Kota hatası (429, yazmalarda tekrar denenir): {s['cagrilar']['kota_hatasi']}")
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="CourtMaster çevrimdışı benchmark")
+    p.add_argument("--boyut", nargs="+", default=["100:10000", "1000:100000"], help="öğrenci:kayıt çiftleri")
+    p.add_argument("--tekrar", type=int, default=5)
+    p.add_argument("--gecikme", type=float, default=0, help="istek başına gecikme (ms)")
+    p.add_argument("--kota", type=int, default=0, help="her N. istekte 429 döndür (0 = kapalı)")
+    p.add_argument("--json", help="sonuçları bu dosyaya da yaz")
+    a = p.parse_args()
+    sonuclar = []
+    for b in a.boyut:
+        ogrenci, kayit = map(int, b.split(":"))
+        s = senaryo(ogrenci, kayit, a.tekrar, a.gecikme / 1000, a.kota)
+        yazdir(s); sonuclar.append(s)
+    if a.json:
+        with open(a.json, "w", encoding="utf-8") as f: json.dump(sonuclar, f, ensure_ascii=False, indent=2, default=float)
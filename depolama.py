@@ -0,0 +1,472 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+
+# --- SÜTUN YAPILARI ---
+COL_OGRENCI = ["Ad Soyad", "Paket (Ders)", "Kalan Ders", "Son Islem", "Durum", "Odeme Durumu", "Notlar", "Surum"]
+COL_FINANS = ["Tarih", "Ay", "Ogrenci", "Tutar", "Not", "Tip"]
+COL_LOG = ["Tarih", "Saat", "Ogrenci", "Islem", "Detay"]
+COL_PROG = ["Saat", "Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+COL_ZIYARET = ["Tarih", "Saat", "Ziyaret"]
+
+SAYFALAR = {
+    "Ogrenci_Data": COL_OGRENCI,
+    "Finans_Kasa": COL_FINANS,
+    "Ders_Gecmisi": COL_LOG,
+    "Ders_Programi": COL_PROG,
+    "Ziyaretci_Ozet": COL_ZIYARET,
+}
+
+# Motorların ortak dili: sayfa adı + başlıksız veri satırları.
+# "pozisyon" başlık hariç 0'dan başlayan satır sırasıdır (Sheets'te satır = pozisyon + 2).
+#   oku(sayfa, baslangic=0)         -> [[str, ...], ...] (baslangic pozisyonundan sona kadar)
+#   satir_sayisi(sayfa)             -> veri satırı sayısı (ucuz sorgu)
+#   satir_oku(sayfa, poz)           -> tek satır
+#   kolon_oku(sayfa, k)             -> k. sütunun (0'dan) tüm değerleri
+#   guncelle(sayfa, {poz: satir})   -> satırları yerinde değiştirir (tek istek)
+#   hucre_guncelle(sayfa, hucreler) -> [(poz, sütun no, değer)] hücrelerini yazar (tek istek)
+#   ekle(sayfa, satirlar)           -> sona ekler (tek istek), eklenen ilk satırın pozisyonu (bilinmiyorsa None)
+#   sil(sayfa, pozisyonlar)         -> satırları siler
+#   yaz(sayfa, kolonlar, satirlar)  -> sayfayı baştan yazar
+#   kur(sayfa, kolonlar, satirlar)  -> sayfayı silip boş şema ile yeniden açar
+#   kosullu_guncelle / kosullu_sil  -> satır hâlâ kosul'a ({sütun no: değer}) uyuyorsa yazar/siler, True/False
+#   surumler()                      -> {sayfa: revizyon}; değer değişmediyse sayfa değişmemiştir (ucuz sorgu)
+
+class CakismaHatasi(Exception):
+    # Satır, okunduktan sonra başka biri tarafından değiştirildi / silindi
+    pass
+
+def _uyuyor(satir, kosul):
+    return all((satir[i] if i < len(satir) else "") == str(v) for i, v in kosul.items())
+
+# --- GOOGLE SHEETS MOTORU ---
+class GSheetsMotoru:
+    def __init__(self, sheet, semalar=SAYFALAR, kota_bekleme=1.5):
+        self.sheet = sheet
+        self.semalar = dict(semalar)
+        self.kota_bekleme = kota_bekleme
+        self._ws = {}
+        self._kilit = threading.Lock() # koşullu yazmalarda oku-karşılaştır-yaz arası
+
+    def _sayfa(self, ad):
+        # sheet.worksheet() her çağrıda metadata isteği atar, nesneyi sakla
+        if ad not in self._ws:
+            try: self._ws[ad] = self.sheet.worksheet(ad)
+            except WorksheetNotFound:
+                # Sonradan eklenen sayfalar (örn. Ziyaretci_Ozet) eski dosyalarda yok, şemadan aç
+                if ad not in self.semalar: raise
+                ws = self.sheet.add_worksheet(ad, 1000, 20)
+                ws.append_row(self.semalar[ad])
+                self._ws[ad] = ws
+        return self._ws[ad]
+
+    def oku(self, ad, baslangic=0):
+        ws = self._sayfa(ad)
+        if baslangic == 0: return ws.get_all_values()[1:]
+        # Sadece yeni satırlar: A{n}:{son sütun}
+        son = rowcol_to_a1(1, len(self.semalar.get(ad, [])) or ws.col_count)[:-1]
+        try: return ws.get_values(f"A{baslangic+2}:{son}")
+        except APIError as e:
+            # Eklemeler sayfayı ilk 1000 satırın ötesine büyüttüyse sayfa son veri satırında biter;
+            # yeni satır yokken A{n+2} ızgaranın dışında kalır ve Sheets 400 döner
+            if e.code == 400 and "exceeds grid limits" in str(e): return []
+            raise
+
+    def satir_sayisi(self, ad):
+        return max(len(self._sayfa(ad).col_values(1)) - 1, 0)
+
+    def satir_oku(self, ad, poz):
+        return self._sayfa(ad).row_values(poz + 2)
+
+    def kolon_oku(self, ad, k):
+        return self._sayfa(ad).col_values(k + 1)[1:]
+
+    def kosullu_guncelle(self, ad, poz, satir, kosul):
+        # Sheets'te CAS yok: aynı süreçteki yazmalar kilitle sıraya girer, okuma ile yazma arası tek istek
+        with self._kilit:
+            if not _uyuyor(self.satir_oku(ad, poz), kosul): return False
+            self.guncelle(ad, {poz: satir})
+            return True
+
+    def kosullu_sil(self, ad, poz, kosul):
+        with self._kilit:
+            if not _uyuyor(self.satir_oku(ad, poz), kosul): return False
+            self.sil(ad, [poz])
+            return True
+
+    def guncelle(self, ad, satirlar):
+        if not satirlar: return
+        veri = [{"range": f"A{p+2}:{rowcol_to_a1(p+2, len(s))}", "values": [s]} for p, s in satirlar.items()]
+        self._sayfa(ad).batch_update(veri)
+
+    def hucre_guncelle(self, ad, hucreler):
+        if not hucreler: return
+        self._sayfa(ad).batch_update([{"range": rowcol_to_a1(p+2, k+1), "values": [[v]]} for p, k, v in hucreler])
+
+    def ekle(self, ad, satirlar):
+        if not satirlar: return None
+        yanit = self._sayfa(ad).append_rows(satirlar)
+        # Sheets satırları nereye eklediğini söyler: updates.updatedRange = "'Sayfa'!A12:F13"
+        aralik = ((yanit or {}).get("updates") or {}).get("updatedRange")
+        if not aralik: return None
+        return a1_to_rowcol(aralik.rpartition("!")[2].split(":")[0])[0] - 2
+
+    def sil(self, ad, pozisyonlar):
+        ws = self._sayfa(ad)
+        for p in sorted(pozisyonlar, reverse=True): ws.delete_rows(p + 2)
+
+    def yaz(self, ad, kolonlar, satirlar):
+        ws = self._sayfa(ad)
+        ws.clear(); ws.update([list(kolonlar)] + list(satirlar))
+
+    def surumler(self):
+        # Sheets'te sayfa başına revizyon yok: dosyanın son değişme zamanı (Drive, tek istek) hepsi için
+        t = self.sheet.get_lastUpdateTime()
+        return {ad: t for ad in self.semalar}
+
+    def kur(self, ad, kolonlar, satirlar=()):
+        try: self.sheet.del_worksheet(self.sheet.worksheet(ad))
+        except: pass
+        self._ws.pop(ad, None)
+        time.sleep(self.kota_bekleme) # API Kotası için bekleme
+        ws = self.sheet.add_worksheet(ad, 1000, 20)
+        ws.append_row(list(kolonlar))
+        if satirlar: ws.append_rows(list(satirlar))
+        self._ws[ad] = ws
+
+# --- YEREL SQLITE MOTORU ---
+def _metin(x):
+    # Sheets'in sakladığı hali: tam sayı değerli float'lar biçimlenir (14.0 -> "14")
+    if isinstance(x, float) and x.is_integer(): return str(int(x))
+    return "" if x is None else x
+
+class SQLiteMotoru:
+    # Her sayfa aynı COL_* başlıklarıyla bir tablo; satır sırası rowid.
+    # Değerler Sheets'teki gibi metin olarak tutulur, tip dönüşümü okuyan tarafta.
+    def __init__(self, yol, semalar=SAYFALAR):
+        self.semalar = dict(semalar)
+        self._kilit = threading.Lock()
+        self._db = sqlite3.connect(yol, check_same_thread=False)
+        if yol != ":memory:": self._db.execute("PRAGMA journal_mode=WAL")
+        with self._kilit, self._db:
+            for ad, kolonlar in self.semalar.items(): self._tablo_ac(ad, kolonlar)
+
+    def _tablo_ac(self, ad, kolonlar):
+        tanim = ", ".join(f'"{k}" TEXT' for k in kolonlar)
+        self._db.execute(f'CREATE TABLE IF NOT EXISTS "{ad}" ({tanim})')
+        # Şemaya sonradan eklenen sütunlar (örn. Surum) eski dosyalarda yok
+        mevcut = [r[1] for r in self._db.execute(f'PRAGMA table_info("{ad}")')]
+        for k in kolonlar:
+            if k not in mevcut: self._db.execute(f'ALTER TABLE "{ad}" ADD COLUMN "{k}" TEXT')
+        # Tablo başına değişiklik sayacı (surumler): her satır ekleme/güncelleme/silmede bir artar
+        self._db.execute('CREATE TABLE IF NOT EXISTS _surum (sayfa TEXT PRIMARY KEY, n INTEGER NOT NULL)')
+        self._db.execute('INSERT OR IGNORE INTO _surum VALUES (?, 0)', (ad,))
+        for olay in ("INSERT", "UPDATE", "DELETE"):
+            self._db.execute(f'CREATE TRIGGER IF NOT EXISTS "{ad}_surum_{olay.lower()}" AFTER {olay} ON "{ad}" '
+                             f"BEGIN UPDATE _surum SET n = n + 1 WHERE sayfa = '{ad}'; END")
+
+    def _duzelt(self, ad, satir):
+        n = len(self.semalar[ad])
+        satir = [_metin(x) for x in satir[:n]]
+        return satir + [""] * (n - len(satir))
+
+    def _rowidler(self, ad):
+        return [r[0] for r in self._db.execute(f'SELECT rowid FROM "{ad}" ORDER BY rowid')]
+
+    def oku(self, ad, baslangic=0):
+        if ad not in self.semalar: raise KeyError(ad)
+        kolonlar = ", ".join(f'"{k}"' for k in self.semalar[ad])
+        with self._kilit:
+            rows = self._db.execute(f'SELECT {kolonlar} FROM "{ad}" ORDER BY rowid LIMIT -1 OFFSET ?', (baslangic,)).fetchall()
+        return [["" if x is None else str(x) for x in r] for r in rows]
+
+    def satir_sayisi(self, ad):
+        if ad not in self.semalar: raise KeyError(ad)
+        with self._kilit: return self._db.execute(f'SELECT COUNT(*) FROM "{ad}"').fetchone()[0]
+
+    def satir_oku(self, ad, poz):
+        kolonlar = ", ".join(f'"{k}"' for k in self.semalar[ad])
+        with self._kilit:
+            r = self._db.execute(f'SELECT {kolonlar} FROM "{ad}" ORDER BY rowid LIMIT 1 OFFSET ?', (poz,)).fetchone()
+        return [] if r is None else ["" if x is None else str(x) for x in r]
+
+    def kolon_oku(self, ad, k):
+        with self._kilit:
+            return ["" if r[0] is None else str(r[0]) for r in self._db.execute(f'SELECT "{self.semalar[ad][k]}" FROM "{ad}" ORDER BY rowid')]
+
+    def _kosul(self, ad, kosul):
+        return " AND ".join(f'COALESCE("{self.semalar[ad][i]}", \'\') = ?' for i in kosul), [str(v) for v in kosul.values()]
+
+    def kosullu_guncelle(self, ad, poz, satir, kosul):
+        # Tek UPDATE ... WHERE: kontrol ve yazma atomik
+        atama = ", ".join(f'"{k}" = ?' for k in self.semalar[ad])
+        sart, degerler = self._kosul(ad, kosul)
+        with self._kilit, self._db:
+            rowid = self._rowidler(ad)
+            if poz >= len(rowid): return False
+            cur = self._db.execute(f'UPDATE "{ad}" SET {atama} WHERE rowid = ? AND {sart}', self._duzelt(ad, satir) + [rowid[poz]] + degerler)
+            return cur.rowcount == 1
+
+    def kosullu_sil(self, ad, poz, kosul):
+        sart, degerler = self._kosul(ad, kosul)
+        with self._kilit, self._db:
+            rowid = self._rowidler(ad)
+            if poz >= len(rowid): return False
+            return self._db.execute(f'DELETE FROM "{ad}" WHERE rowid = ? AND {sart}', [rowid[poz]] + degerler).rowcount == 1
+
+    def guncelle(self, ad, satirlar):
+        if not satirlar: return
+        atama = ", ".join(f'"{k}" = ?' for k in self.semalar[ad])
+        with self._kilit, self._db:
+            rowid = self._rowidler(ad)
+            self._db.executemany(f'UPDATE "{ad}" SET {atama} WHERE rowid = ?',
+                                 [self._duzelt(ad, s) + [rowid[p]] for p, s in satirlar.items()])
+
+    def hucre_guncelle(self, ad, hucreler):
+        if not hucreler: return
+        kolonlar = self.semalar[ad]
+        with self._kilit, self._db:
+            rowid = self._rowidler(ad)
+            for p, k, v in hucreler:
+                self._db.execute(f'UPDATE "{ad}" SET "{kolonlar[k]}" = ? WHERE rowid = ?', (_metin(v), rowid[p]))
+
+    def _ekle(self, ad, satirlar):
+        # _kilit ve işlem içinde çağrılır
+        yer = ", ".join("?" * len(self.semalar[ad]))
+        self._db.executemany(f'INSERT INTO "{ad}" VALUES ({yer})', [self._duzelt(ad, s) for s in satirlar])
+
+    def ekle(self, ad, satirlar):
+        if not satirlar: return None
+        with self._kilit, self._db:
+            poz = self._db.execute(f'SELECT COUNT(*) FROM "{ad}"').fetchone()[0]
+            self._ekle(ad, satirlar)
+        return poz
+
+    def sil(self, ad, pozisyonlar):
+        if not pozisyonlar: return
+        with self._kilit, self._db:
+            rowid = self._rowidler(ad)
+            self._db.executemany(f'DELETE FROM "{ad}" WHERE rowid = ?', [(rowid[p],) for p in pozisyonlar])
+
+    def yaz(self, ad, kolonlar, satirlar):
+        # Silme ve yeniden yazma tek işlemde: okuyan taraf boş tablo görmez
+        with self._kilit, self._db:
+            self._db.execute(f'DELETE FROM "{ad}"')
+            self._ekle(ad, list(satirlar))
+
+    def surumler(self):
+        with self._kilit: return dict(self._db.execute('SELECT sayfa, n FROM _surum').fetchall())
+
+    def kur(self, ad, kolonlar, satirlar=()):
+        # DROP/CREATE örtük işlem açmaz; BEGIN ile yeniden yazmayla birlikte tek işlem
+        with self._kilit, self._db:
+            self._db.execute("BEGIN")
+            self.semalar[ad] = list(kolonlar)
+            self._db.execute(f'DROP TABLE IF EXISTS "{ad}"')
+            self._tablo_ac(ad, kolonlar)
+            self._db.execute('UPDATE _surum SET n = n + 1 WHERE sayfa = ?', (ad,))
+            self._ekle(ad, list(satirlar))
+
+# --- YAZMA KUYRUĞU (WRITE-BEHIND) ---
+def kota_hatasi(e):
+    kod = getattr(getattr(e, "response", None), "status_code", None)
+    return kod == 429 or "429" in str(e) or "Quota" in str(e)
+
+class YazmaKuyrugu:
+    # append_data satırlarını sayfa başına biriktirir, gonder() ile sayfa başına tek ekle() isteği atar.
+    # Her satır önce spool dosyasına yazılır; süreç gönderimden önce ölürse açılışta geri yüklenir.
+    def __init__(self, motor, spool_yolu, pencere=2.0, deneme=5, bekleme=1.0, gonderildi=None):
+        self.motor = motor
+        self.spool_yolu = spool_yolu
+        self.pencere = pencere
+        self.deneme = deneme
+        self.bekleme = bekleme
+        self.gonderildi = gonderildi
+        self._kuyruk = {}
+        self._kilit = threading.Lock()
+        self._gonderim = threading.Lock()
+        self._zamanlayici = None
+        self._hata = 0 # art arda başarısız gönderim sayısı
+        self._spool_oku()
+
+    def _spool_oku(self):
+        if not os.path.exists(self.spool_yolu): return
+        with open(self.spool_yolu, encoding="utf-8") as f:
+            for satir in f:
+                try: kayit = json.loads(satir)
+                except ValueError: continue # yarım yazılmış son satır
+                self._kuyruk.setdefault(kayit["sayfa"], []).append(kayit["satir"])
+
+    def _spool_yaz(self):
+        gecici = self.spool_yolu + ".tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            for sayfa, satirlar in self._kuyruk.items():
+                for s in satirlar: f.write(json.dumps({"sayfa": sayfa, "satir": s}, ensure_ascii=False) + "\n")
+            f.flush(); os.fsync(f.fileno())
+        os.replace(gecici, self.spool_yolu)
+
+    def ekle(self, sayfa, satir):
+        with self._kilit:
+            with open(self.spool_yolu, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"sayfa": sayfa, "satir": satir}, ensure_ascii=False) + "\n")
+                f.flush(); os.fsync(f.fileno())
+            self._kuyruk.setdefault(sayfa, []).append(satir)
+            if self.pencere and self._zamanlayici is None: self._kur(self.pencere)
+
+    def _kur(self, sure):
+        # _kilit tutulurken çağrılır
+        self._zamanlayici = threading.Timer(sure, self._zamanli_gonder)
+        self._zamanlayici.daemon = True
+        self._zamanlayici.start()
+
+    def bekleyen(self):
+        with self._kilit: return sum(len(v) for v in self._kuyruk.values())
+
+    def _zamanli_gonder(self):
+        with self._kilit: self._zamanlayici = None
+        try: self.gonder()
+        except: pass # satırlar kuyrukta/spool'da kalır, gonder zamanlayıcıyı yeniden kurar
+
+    def _dene(self, sayfa, satirlar, deneme):
+        for n in range(deneme):
+            try: return self.motor.ekle(sayfa, satirlar)
+            except Exception as e:
+                if not kota_hatasi(e) or n == deneme - 1: raise
+                time.sleep(self.bekleme * 2 ** n)
+
+    def gonder(self, deneme=None, bekle=True):
+        # deneme: sayfa başına deneme sayısı (varsayılan self.deneme). Betik iş parçacığından
+        # gonder(deneme=1, bekle=False) çağrılır: tek deneme, arka planda süren gönderimi beklemez;
+        # tekrarlar ve kota beklemeleri zamanlayıcının iş parçacığında kalır.
+        if not self._gonderim.acquire(blocking=bekle): return []
+        try:
+            with self._kilit:
+                paket, self._kuyruk = self._kuyruk, {}
+            if not paket: return []
+            gonderilen, hata = {}, None
+            for sayfa, satirlar in paket.items():
+                try: gonderilen[sayfa] = (self._dene(sayfa, satirlar, deneme or self.deneme), satirlar)
+                except Exception as e: hata = hata or e
+            with self._kilit:
+                for sayfa, satirlar in paket.items():
+                    if sayfa not in gonderilen: self._kuyruk[sayfa] = satirlar + self._kuyruk.get(sayfa, [])
+                self._spool_yaz()
+                if not hata: self._hata = 0
+                else:
+                    # Kalan satırlar için artan beklemeyle arka plan denemesi
+                    self._hata += 1
+                    if self.pencere and self._zamanlayici is None: self._kur(self.pencere * 2 ** min(self._hata, 6))
+        finally: self._gonderim.release()
+        # gonderildi({sayfa: (ilk satırın pozisyonu | None, satirlar)})
+        if gonderilen and self.gonderildi: self.gonderildi(gonderilen)
+        if hata: raise hata
+        return list(gonderilen)
+
+# --- HÜCRE TAMPONU (DEBOUNCE) ---
+class HucreTamponu:
+    # Art arda gelen hücre düzenlemelerini biriktirir. Son düzenlemeden `bekleme` saniye sonra
+    # her hücrenin sadece son değeri, sayfa başına tek hucre_guncelle isteğiyle yazılır.
+    def __init__(self, motor, bekleme=1.5, yazildi=None):
+        self.motor = motor
+        self.bekleme = bekleme
+        self.yazildi = yazildi
+        self._bekleyen = {}
+        self._hata = 0 # art arda başarısız gönderim sayısı
+        self._kilit = threading.Lock()
+        self._zamanlayici = None
+        atexit.register(self._zamanli_gonder)
+
+    def _kur(self, sure):
+        # _kilit tutulurken çağrılır
+        if self._zamanlayici is not None: self._zamanlayici.cancel()
+        self._zamanlayici = threading.Timer(sure, self._zamanli_gonder)
+        self._zamanlayici.daemon = True
+        self._zamanlayici.start()
+
+    def ekle(self, sayfa, poz, kolon, deger):
+        with self._kilit:
+            self._bekleyen[(sayfa, poz, kolon)] = deger
+            self._kur(self.bekleme)
+
+    def bekleyen(self):
+        with self._kilit: return len(self._bekleyen)
+
+    def _gonder_ve_kur(self):
+        # Hücreler tamponda kaldıysa (örn. 429) artan beklemeyle tekrar denemek üzere zamanlayıcı kurar
+        try: self.gonder()
+        except:
+            with self._kilit:
+                if self._zamanlayici is None and self._bekleyen: self._kur(self.bekleme * 2 ** min(self._hata, 6))
+            raise
+
+    def _zamanli_gonder(self):
+        try: self._gonder_ve_kur()
+        except: pass
+
+    def tekrar_dene(self):
+        # Önceki gönderim başarısız olduysa zamanlayıcıyı beklemeden bir kez dener
+        with self._kilit:
+            if not self._hata or not self._bekleyen: return False
+        self._gonder_ve_kur()
+        return True
+
+    def gonder(self):
+        with self._kilit:
+            paket, self._bekleyen = self._bekleyen, {}
+            self._zamanlayici = None
+        sayfalar = {}
+        for (sayfa, poz, kolon), deger in paket.items(): sayfalar.setdefault(sayfa, []).append((poz, kolon, deger))
+        sayfalar = list(sayfalar.items())
+        for i, (sayfa, hucreler) in enumerate(sayfalar):
+            try: self.motor.hucre_guncelle(sayfa, hucreler)
+            except:
+                with self._kilit: # bu ve sonraki sayfaların hücrelerini, daha yeni değer girilmediyse geri koy
+                    for s, h in sayfalar[i:]:
+                        for poz, kolon, deger in h: self._bekleyen.setdefault((s, poz, kolon), deger)
+                    self._hata += 1
+                raise
+            if self.yazildi: self.yazildi(sayfa, hucreler)
+        with self._kilit: self._hata = 0
+
+# --- ZİYARETÇİ SAYACI ---
+class ZiyaretSayaci:
+    # Sayfa açılışlarını bellekte saat bazında sayar, hiçbir istek atmaz. Arka plan
+    # iş parçacığı her `aralik` saniyede bir tamamlanmış saatlerin özet satırlarını
+    # (Tarih, Saat, Ziyaret) yazma kuyruğuna bırakır: saat başına tek satır. İçinde
+    # bulunulan saat bellekte kalır, süreç kapanırken yazılır.
+    def __init__(self, kuyruk, sayfa="Ziyaretci_Ozet", aralik=60):
+        self.kuyruk = kuyruk
+        self.sayfa = sayfa
+        self.aralik = aralik
+        self._sayim = {}
+        self._kilit = threading.Lock()
+        threading.Thread(target=self._dongu, daemon=True).start()
+        atexit.register(self.bosalt, tumu=True)
+
+    @staticmethod
+    def _anahtar(an):
+        return (an.strftime("%d-%m-%Y"), an.strftime("%H:00"))
+
+    def kaydet(self, an=None):
+        anahtar = self._anahtar(an or datetime.now())
+        with self._kilit: self._sayim[anahtar] = self._sayim.get(anahtar, 0) + 1
+
+    def bosalt(self, tumu=False, an=None):
+        # tumu=False: sadece `an` (varsayılan şimdi) saatinden önceki saatler yazılır
+        simdi = self._anahtar(an or datetime.now())
+        with self._kilit:
+            sayim = {a: n for a, n in self._sayim.items() if tumu or a != simdi}
+            for a in sayim: del self._sayim[a]
+        for (tarih, saat), n in sayim.items(): self.kuyruk.ekle(self.sayfa, [tarih, saat, n])
+
+    def _dongu(self):
+        while True:
+            time.sleep(self.aralik)
+            try: self.bosalt()
+            except: pass
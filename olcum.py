@@ -0,0 +1,141 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# --- ÖLÇÜM KAYDI ---
+# Her kayıt (tür, menü, ...anahtar) altında tutulur: çağrı/hata sayısı, toplam süre, giden/gelen
+# yaklaşık bayt ve gecikme histogramı. Menü, çağrıyı yapan iş parçacığının etiketidir; arka plan
+# gönderimleri (yazma kuyruğu, hücre tamponu) "arka plan" olarak görünür.
+#   api:       motor çağrıları          (menü, sayfa, işlem)
+#   fonksiyon: uygulama fonksiyonları   (menü, sayfa, fonksiyon)
+#   cizim:     menü sayfası çizimi      (menü,)
+ALANLAR = {"api": ("menu", "sayfa", "islem"), "fonksiyon": ("menu", "sayfa", "fonksiyon"), "cizim": ("menu",)}
+KOVALAR = (1, 5, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000) # ms, üst sınırlar (+ sonsuz)
+
+def _boyut(x):
+    # Aktarılan verinin yaklaşık boyutu: satır listelerinin metin hali
+    return 0 if x is None or isinstance(x, bool) else len(repr(x))
+
+def _kacis(v):
+    # Prometheus etiket değeri
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Olcum:
+    def __init__(self, kovalar=KOVALAR):
+        self.kovalar = tuple(kovalar)
+        self._kilit = threading.Lock()
+        self._yerel = threading.local()
+        self._kayit = {}
+        self.baslangic = time.time()
+
+    def etiketle(self, menu):
+        self._yerel.menu = menu
+
+    def etiket(self):
+        return getattr(self._yerel, "menu", "arka plan")
+
+    def kaydet(self, tur, anahtar, ms, giden=0, gelen=0, hata=False):
+        kova = next((i for i, s in enumerate(self.kovalar) if ms <= s), len(self.kovalar))
+        anahtar = (tur, self.etiket()) + tuple(anahtar)
+        with self._kilit:
+            k = self._kayit.get(anahtar)
+            if k is None:
+                k = self._kayit[anahtar] = {
+                    "sayi": 0, "hata": 0, "ms": 0.0, "giden": 0, "gelen": 0, "kova": [0] * (len(self.kovalar) + 1)}
+            k["sayi"] += 1; k["hata"] += bool(hata); k["ms"] += ms
+            k["giden"] += giden; k["gelen"] += gelen; k["kova"][kova] += 1
+
+    @contextmanager
+    def zamanla(self, tur, *anahtar):
+        t0, hata = time.perf_counter(), True
+        try:
+            yield
+            hata = False
+        finally: self.kaydet(tur, anahtar, (time.perf_counter() - t0) * 1000, hata=hata)
+
+    def _yuzdelik(self, kova, q):
+        # Histogramdan tahmin: q'nuncu çağrının düştüğü kovanın üst sınırı
+        hedef, toplam = q * sum(kova), 0
+        for i, n in enumerate(kova):
+            toplam += n
+            if n and toplam >= hedef: return self.kovalar[i] if i < len(self.kovalar) else float("inf")
+        return 0
+
+    def ozet(self, tur, gruplar):
+        # tur kayıtlarını seçilen alanlara göre toplar (örn. ("sayfa", "islem") menüleri birleştirir)
+        alanlar = ALANLAR[tur]
+        with self._kilit:
+            kayitlar = [(a[1:], dict(k, kova=list(k["kova"]))) for a, k in self._kayit.items() if a[0] == tur]
+        toplam = {}
+        for anahtar, k in kayitlar:
+            g = tuple(anahtar[alanlar.index(ad)] for ad in gruplar)
+            t = toplam.setdefault(g, {"sayi": 0, "hata": 0, "ms": 0.0, "giden": 0, "gelen": 0, "kova": [0] * len(k["kova"])})
+            for ad in ("sayi", "hata", "ms", "giden", "gelen"): t[ad] += k[ad]
+            t["kova"] = [x + y for x, y in zip(t["kova"], k["kova"])]
+        return [dict(zip(gruplar, g), cagri=t["sayi"], hata=t["hata"], ort_ms=round(t["ms"] / t["sayi"], 1),
+                     p50_ms=self._yuzdelik(t["kova"], 0.5), p95_ms=self._yuzdelik(t["kova"], 0.95),
+                     giden_kb=round(t["giden"] / 1024, 1), gelen_kb=round(t["gelen"] / 1024, 1))
+                for g, t in sorted(toplam.items(), key=lambda x: -x[1]["sayi"])]
+
+    def prometheus(self, onbellek=None, servis=None):
+        # Prometheus metin biçimi; onbellek = VeriOnbellek.sayaclar(), servis = VeriServisi.sayaclar()
+        def etiket(d): return ",".join(f'{a}="{_kacis(v)}"' for a, v in d.items())
+        with self._kilit: kayitlar = [(a, dict(k, kova=list(k["kova"]))) for a, k in self._kayit.items()]
+        satirlar = []
+        for tur in ALANLAR:
+            ad = f"courtmaster_{tur}"
+            satirlar += [f"# TYPE {ad}_sure_ms histogram", f"# TYPE {ad}_hata_total counter", f"# TYPE {ad}_bayt_total counter"]
+            for a, k in kayitlar:
+                if a[0] != tur: continue
+                e = dict(zip(ALANLAR[tur], a[1:]))
+                birikim = 0
+                for s, n in zip(self.kovalar + ("+Inf",), k["kova"]):
+                    birikim += n
+                    satirlar.append(f"{ad}_sure_ms_bucket{{{etiket({**e, 'le': s})}}} {birikim}")
+                satirlar += [f"{ad}_sure_ms_sum{{{etiket(e)}}} {k['ms']:.3f}", f"{ad}_sure_ms_count{{{etiket(e)}}} {k['sayi']}",
+                             f"{ad}_hata_total{{{etiket(e)}}} {k['hata']}"]
+                if k["giden"] or k["gelen"]:
+                    satirlar += [f"{ad}_bayt_total{{{etiket({**e, 'yon': 'giden'})}}} {k['giden']}",
+                                 f"{ad}_bayt_total{{{etiket({**e, 'yon': 'gelen'})}}} {k['gelen']}"]
+        if onbellek:
+            satirlar.append("# TYPE courtmaster_onbellek_total counter")
+            for sayfa, olaylar in onbellek.items():
+                for olay, n in olaylar.items():
+                    satirlar.append(f"courtmaster_onbellek_total{{{etiket({'sayfa': sayfa, 'olay': olay})}}} {n}")
+        if servis:
+            satirlar += ["# TYPE courtmaster_servis_total counter"] + [
+                f"courtmaster_servis_total{{{etiket({'olay': olay})}}} {n}" for olay, n in servis.items() if olay != "nesil"]
+            satirlar += ["# TYPE courtmaster_servis_nesil gauge", f"courtmaster_servis_nesil {servis.get('nesil', 0)}"]
+        return "\n".join(satirlar) + "\n"
+
+    def sifirla(self):
+        with self._kilit: self._kayit.clear()
+        self.baslangic = time.time()
+
+# --- ÖLÇÜMLÜ MOTOR ---
+# Depolama motorunu sarar: ilk argümanı sayfa adı olan her motor çağrısı süre, hata ve bayt
+# olarak kaydedilir. Motorun kendi içinden yaptığı çağrılar (kosullu_guncelle içindeki okuma gibi)
+# dışarıdan tek işlem olarak görünür. Sayfaya bağlı olmayan çağrılar (surumler) sayfa "-" altında.
+MOTOR_ISLEMLERI = {"oku", "satir_sayisi", "satir_oku", "kolon_oku", "kosullu_guncelle", "kosullu_sil",
+                   "guncelle", "hucre_guncelle", "ekle", "sil", "yaz", "kur"}
+GENEL_ISLEMLER = {"surumler"}
+
+class OlcumluMotor:
+    def __init__(self, motor, olcum):
+        self.motor = motor
+        self.olcum = olcum
+
+    def __getattr__(self, ad):
+        hedef = getattr(self.motor, ad)
+        if ad not in MOTOR_ISLEMLERI and ad not in GENEL_ISLEMLER: return hedef
+        def olcumlu(*args, **kwargs):
+            sayfa, veri = (args[0], args[1:]) if ad in MOTOR_ISLEMLERI else ("-", args)
+            t0, sonuc, hata = time.perf_counter(), None, True
+            try:
+                sonuc = hedef(*args, **kwargs)
+                hata = False
+                return sonuc
+            finally:
+                self.olcum.kaydet("api", (sayfa, ad), (time.perf_counter() - t0) * 1000,
+                                  giden=_boyut(veri) if veri else 0, gelen=_boyut(sonuc), hata=hata)
+        return olcumlu
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from depolama import COL_FINANS, COL_OGRENCI, CakismaHatasi, SQLiteMotoru, YazmaKuyrugu
+from veri import VeriOnbellek, cerceve_kur, kasa_ozeti, kosullu_satir_guncelle, kosullu_satir_sil
+
+def _kurulum(tmp_path):
+    motor = SQLiteMotoru(str(tmp_path / "veri.db"))
+    onbellek = VeriOnbellek(motor, ttl=3600)
+    kuyruk = YazmaKuyrugu(motor, str(tmp_path / "spool.jsonl"), pencere=0,
+                          gonderildi=lambda g: [onbellek.satir_ekle(s, r, poz) for s, (poz, r) in g.items()])
+    return motor, onbellek, kuyruk
+
+def _satir(ad, tutar):
+    return ["01-10-2026", "Ekim", ad, tutar, "", "Gelir"]
+
+def test_arada_dis_ekleme_varsa_yama_yapilmaz(tmp_path):
+    # Önbellek Ali'yi görmüş, başka bir süreç Veli'yi eklemiş, sonra bizim Can gönderiliyor
+    motor, onbellek, kuyruk = _kurulum(tmp_path)
+    kuyruk.ekle("Finans_Kasa", _satir("Ali", 500)); kuyruk.gonder()
+    onbellek.turet("Finans_Kasa", COL_FINANS, "kasa", *kasa_ozeti())
+    SQLiteMotoru(str(tmp_path / "veri.db")).ekle("Finans_Kasa", [_satir("Veli", 1000)])
+    kuyruk.ekle("Finans_Kasa", _satir("Can", 200)); kuyruk.gonder()
+
+    ozet, df = onbellek.turet("Finans_Kasa", COL_FINANS, "kasa", *kasa_ozeti())
+    assert list(df["Ogrenci"]) == ["Ali", "Veli", "Can"]
+    assert list(df.index) == [0, 1, 2]
+    assert ozet["tip"]["Gelir"] == 1700
+    assert len(df) == motor.satir_sayisi("Finans_Kasa")
+
+def test_kaydin_sonuna_gelen_satirlar_yamalanir(tmp_path):
+    motor, onbellek, kuyruk = _kurulum(tmp_path)
+    kuyruk.ekle("Finans_Kasa", _satir("Ali", 500)); kuyruk.gonder()
+    onbellek.al("Finans_Kasa", COL_FINANS)
+    kuyruk.ekle("Finans_Kasa", _satir("Can", 200)); kuyruk.gonder()
+
+    assert list(onbellek.al("Finans_Kasa", COL_FINANS)["Ogrenci"]) == ["Ali", "Can"]
+    assert onbellek.sayaclar()["Finans_Kasa"].get("yama") == 1
+    assert onbellek.sayaclar()["Finans_Kasa"].get("artimli") == 0
+
+# --- SATIR BAZLI GÜNCELLEME ---
+def _ogrenci_kurulum(tmp_path, *adlar):
+    motor = SQLiteMotoru(str(tmp_path / "veri.db"))
+    motor.ekle("Ogrenci_Data", [[ad, "10", "10", "-", "Aktif", "Ödendi", "-", "1"] for ad in adlar])
+    return motor
+
+def _oku(motor):
+    return cerceve_kur(motor.oku("Ogrenci_Data"), COL_OGRENCI, sayfa="Ogrenci_Data")
+
+def _ders_dus(satir):
+    satir["Kalan Ders"] = satir["Kalan Ders"] - 1
+    return satir
+
+def test_iki_eski_cerceveden_dusulen_dersler_kaybolmaz(tmp_path):
+    motor = _ogrenci_kurulum(tmp_path, "Ali")
+    df1, df2 = _oku(motor), _oku(motor) # iki tablet aynı hali okumuş
+    kosullu_satir_guncelle(motor, "Ogrenci_Data", df1, 0, COL_OGRENCI, _ders_dus)
+    poz, hucreler, yeni = kosullu_satir_guncelle(motor, "Ogrenci_Data", df2, 0, COL_OGRENCI, _ders_dus)
+    assert motor.oku("Ogrenci_Data")[0][2] == "8"
+    assert yeni["Surum"] == "3" and hucreler[COL_OGRENCI.index("Surum")] == "3"
+
+def test_silmeyle_kayan_satir_bulunup_guncellenir(tmp_path):
+    motor = _ogrenci_kurulum(tmp_path, "Ali", "Can")
+    df = _oku(motor)
+    motor.sil("Ogrenci_Data", [0])
+    poz, _, _ = kosullu_satir_guncelle(motor, "Ogrenci_Data", df, 1, COL_OGRENCI, _ders_dus)
+    assert poz == 0
+    assert [r[:3] for r in motor.oku("Ogrenci_Data")] == [["Can", "10", "9"]]
+
+def test_denemeler_bitince_cakisma_hatasi(tmp_path):
+    motor = _ogrenci_kurulum(tmp_path, "Ali")
+    df = _oku(motor)
+    def hep_cakis(satir):
+        # Her denemede araya başka bir yazma girer
+        r = motor.satir_oku("Ogrenci_Data", 0)
+        motor.guncelle("Ogrenci_Data", {0: r[:-1] + [str(int(r[-1]) + 1)]})
+        return _ders_dus(satir)
+    with pytest.raises(CakismaHatasi):
+        kosullu_satir_guncelle(motor, "Ogrenci_Data", df, 0, COL_OGRENCI, hep_cakis, deneme=3)
+    assert motor.oku("Ogrenci_Data")[0][2] == "10"
+
+def test_degismis_satir_silinmez(tmp_path):
+    motor = _ogrenci_kurulum(tmp_path, "Ali")
+    df = _oku(motor)
+    kosullu_satir_guncelle(motor, "Ogrenci_Data", _oku(motor), 0, COL_OGRENCI, _ders_dus)
+    with pytest.raises(CakismaHatasi):
+        kosullu_satir_sil(motor, "Ogrenci_Data", df, 0, COL_OGRENCI)
+    assert motor.satir_sayisi("Ogrenci_Data") == 1
@@ -0,0 +1,450 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from depolama import CakismaHatasi
+
+# --- TİPLİ ŞEMA ---
+# Sayfalar okunurken bir kere tiplenir: tekrar eden metinler kategorik, sayılar sayısal olur.
+# Tarihli sayfalara sayfanın kendi biçimiyle ayrıştırılmış bir "Zaman" (datetime64) sütunu
+# eklenir; Tarih/Saat metinleri yazma ve gösterim için olduğu gibi (kategorik) kalır.
+# Şemada olmayan sütunlar (Notlar, Detay, Surum...) metin kalır.
+TIPLER = {
+    "Ogrenci_Data": {"Paket (Ders)": "sayi", "Kalan Ders": "sayi", "Durum": "kategori", "Odeme Durumu": "kategori"},
+    "Finans_Kasa": {"Tarih": "kategori", "Ay": "kategori", "Ogrenci": "kategori", "Tutar": "sayi", "Tip": "kategori"},
+    "Ders_Gecmisi": {"Tarih": "kategori", "Saat": "kategori", "Ogrenci": "kategori", "Islem": "kategori"},
+    "Ziyaretci_Ozet": {"Tarih": "kategori", "Saat": "kategori", "Ziyaret": "sayi"},
+}
+# sayfa -> (tarih sütunu, saat sütunu | None, tarih biçimi)
+ZAMAN = {
+    "Finans_Kasa": ("Tarih", None, "%Y-%m-%d"),
+    "Ders_Gecmisi": ("Tarih", "Saat", "%d-%m-%Y"),
+    "Ziyaretci_Ozet": ("Tarih", "Saat", "%d-%m-%Y"),
+}
+
+def _kategoriden(kat, donustur, bos):
+    # Her farklı değer bir kere dönüştürülür, satırlara kodlarla dağıtılır (kod -1 = boş hücre)
+    degerler = np.append(donustur(kat.cat.categories.astype(str)).to_numpy(), [bos])
+    return degerler[kat.cat.codes.to_numpy()]
+
+def tiple(df, sayfa):
+    # df'in şemadaki sütunlarını tipler ve Zaman'ı (yeniden) hesaplar; df değiştirilmez
+    tipler, zaman = TIPLER.get(sayfa, {}), ZAMAN.get(sayfa)
+    if not tipler and not zaman: return df
+    df = df.copy()
+    for k, tip in tipler.items():
+        if k not in df.columns: continue
+        if tip == "kategori":
+            df[k] = df[k].astype("category")
+        elif not pd.api.types.is_numeric_dtype(df[k]):
+            metin = df[k].astype(str).str.strip().str.replace(',', '.', regex=False)
+            df[k] = pd.to_numeric(metin, errors='coerce').fillna(0)
+    if zaman:
+        t, s, bicim = zaman
+        z = _kategoriden(df[t], lambda c: pd.to_datetime(c, format=bicim, errors='coerce'), np.datetime64("NaT", "ns"))
+        if s is not None:
+            z = z + _kategoriden(df[s], lambda c: pd.to_timedelta((c + ":00").where(c.str.fullmatch(r"\d{1,2}:\d{2}")), errors='coerce').fillna(pd.Timedelta(0)), np.timedelta64(0, "ns"))
+        df["Zaman"] = pd.DatetimeIndex(z).as_unit("ns")
+    return df
+
+def kategorileri_esle(ilk, *digerleri):
+    # Kategorik sütunlarda kategori kümeleri eşitlenir (yerinde): concat kategorik kalır, yeni değer
+    # atanabilir. İlk (büyük) çerçevenin kategorilerine sadece ekleme yapılır, kodları değişmez.
+    for k in ilk.columns:
+        if not isinstance(ilk[k].dtype, pd.CategoricalDtype): continue
+        kat = ilk[k].cat.categories
+        for d in digerleri: kat = kat.append(pd.Index(d[k].dropna().unique()).difference(kat))
+        if len(kat) > len(ilk[k].cat.categories): ilk[k] = ilk[k].cat.add_categories(kat[len(ilk[k].cat.categories):])
+        for d in digerleri:
+            if not (isinstance(d[k].dtype, pd.CategoricalDtype) and d[k].cat.categories.equals(kat)):
+                d[k] = pd.Categorical(d[k], categories=kat)
+    return (ilk,) + digerleri
+
+# --- SATIRLARDAN DATAFRAME ---
+def cerceve_kur(satirlar, kolonlar, baslangic=0, sayfa=None):
+    # Kısa satırlar None ile doldurulur, fazla sütunlar atılır (satır satır döngü yok); sayfa
+    # verilirse TIPLER'e göre tiplenir
+    df = pd.DataFrame(satirlar) if len(satirlar) else pd.DataFrame()
+    df = df.reindex(columns=range(len(kolonlar)))
+    df.columns = kolonlar
+    df.index = pd.RangeIndex(baslangic, baslangic + len(df))
+    return tiple(df, sayfa)
+
+# --- FARK İLE YAZMA ---
+def hucre_degeri(x):
+    if hasattr(x, "item"): x = x.item()
+    if x is None or x is pd.NA or (isinstance(x, float) and pd.isna(x)): return ""
+    if isinstance(x, (int, float)): return x
+    return str(x)
+
+def satir_degerleri(df, i, kolonlar):
+    return [hucre_degeri(x) for x in df.loc[i, kolonlar].tolist()]
+
+def fark_yaz(motor, sayfa, eski, yeni, kolonlar):
+    # yeni'yi, sayfanın okunduğu hali olan eski'ye göre yazar: değişen satırlar tek guncelle,
+    # eklenenler tek ekle, çıkarılanlar sil. Sayfanın yeni halini (kalan satırlar eski sırasıyla,
+    # eklenenler sonda) ve bir şey yazılıp yazılmadığını döner.
+    ortak = yeni.index[yeni.index.isin(eski.index)]
+    yeni_deger = yeni.loc[ortak, kolonlar].astype(str).values
+    eski_deger = eski.loc[ortak, kolonlar].astype(str).values
+    degisen = ortak[(yeni_deger != eski_deger).any(axis=1)]
+    silinen = eski.index[~eski.index.isin(yeni.index)]
+    eklenen = yeni.index[~yeni.index.isin(eski.index)]
+
+    motor.guncelle(sayfa, {eski.index.get_loc(i): satir_degerleri(yeni, i, kolonlar) for i in degisen})
+    motor.sil(sayfa, [eski.index.get_loc(i) for i in silinen])
+    motor.ekle(sayfa, [satir_degerleri(yeni, i, kolonlar) for i in eklenen])
+
+    kalan = eski.index[eski.index.isin(yeni.index)]
+    return yeni.loc[kalan.append(eklenen)], bool(len(degisen) or len(silinen) or len(eklenen))
+
+# --- SATIR BAZLI GÜNCELLEME (İYİMSER EŞZAMANLILIK) ---
+# Satır, okunduğu andaki Surum değeri hâlâ aynıysa yazılır ve Surum bir artar. Arada başka
+# biri yazdıysa satırın tazesi okunur, degistir tekrar uygulanır; olmazsa CakismaHatasi.
+def _satir_tazele(motor, sayfa, kolonlar, ad, poz):
+    # Satırın güncel hali; yeri değiştiyse (araya silme girdiyse) ada göre bulunur
+    if poz is None or (motor.satir_oku(sayfa, poz) or [""])[0] != ad:
+        adlar = motor.kolon_oku(sayfa, 0)
+        if ad not in adlar: raise CakismaHatasi(f"{ad} kaydı silinmiş")
+        poz = adlar.index(ad)
+    return poz, cerceve_kur([motor.satir_oku(sayfa, poz)], kolonlar, sayfa=sayfa).iloc[0].to_dict()
+
+def kosullu_satir_guncelle(motor, sayfa, df, idx, kolonlar, degistir, deneme=3):
+    # df'in idx satırına degistir(satir) -> yeni satır | None uygular. Yazılan (poz, hucreler, yeni)
+    # döner; degistir None dönerse None.
+    ad = df.at[idx, kolonlar[0]]
+    poz, satir = df.index.get_loc(idx), df.loc[idx, kolonlar].to_dict()
+    for _ in range(deneme):
+        yeni = degistir(dict(satir))
+        if yeni is None: return None
+        eski_surum = str(hucre_degeri(satir["Surum"]))
+        yeni["Surum"] = str(int(float(eski_surum or 0)) + 1)
+        hucreler = [hucre_degeri(yeni[c]) for c in kolonlar]
+        if motor.kosullu_guncelle(sayfa, poz, hucreler, {0: ad, kolonlar.index("Surum"): eski_surum}):
+            return poz, hucreler, yeni
+        poz, satir = _satir_tazele(motor, sayfa, kolonlar, ad, poz)
+    raise CakismaHatasi(f"{ad} kaydı aynı anda değiştiriliyor, tekrar deneyin")
+
+def kosullu_satir_sil(motor, sayfa, df, idx, kolonlar):
+    ad = df.at[idx, kolonlar[0]]
+    poz, surum = df.index.get_loc(idx), str(hucre_degeri(df.at[idx, "Surum"]))
+    if not motor.kosullu_sil(sayfa, poz, {0: ad, kolonlar.index("Surum"): surum}):
+        # Satır kaydıysa yerini bul; içerik değiştiyse silme (başkası az önce işlem yaptı)
+        poz, satir = _satir_tazele(motor, sayfa, kolonlar, ad, None)
+        if str(hucre_degeri(satir["Surum"])) != surum or not motor.kosullu_sil(sayfa, poz, {0: ad, kolonlar.index("Surum"): surum}):
+            raise CakismaHatasi(f"{ad} kaydı bu arada değişti, silinmedi")
+
+# --- SAYFA BAŞINA ÖNBELLEK ---
+# Sadece sona satır eklenen sayfalar: süre dolunca baştan değil, kalınan yerden okunur
+EKLEME_SAYFALARI = {"Ders_Gecmisi", "Finans_Kasa", "Ziyaretci_Ozet"}
+
+class VeriOnbellek:
+    # Her sayfa kendi kaydını ve sürüm numarasını tutar. Bir sayfaya yazmak sadece
+    # o sayfanın kaydını etkiler; bilinen değişiklik (ekleme / kaydetme) kayda yama
+    # olarak işlenir, yeniden okuma gerekmez. Süre dolunca (ttl) sayfa tekrar okunur;
+    # EKLEME_SAYFALARI için sadece yeni satırlar çekilir, arada bir (tam_okuma) baştan okunur.
+    def __init__(self, motor, ttl=10, tam_okuma=600, ekleme_sayfalari=EKLEME_SAYFALARI):
+        self.motor = motor
+        self.ttl = ttl
+        self.tam_okuma = tam_okuma
+        self.ekleme_sayfalari = set(ekleme_sayfalari)
+        self._kayit = {}
+        self._son = {}
+        self._gorunum = {}
+        self._surum = {}
+        self._sayac = {}
+        self._kilit = threading.Lock()
+
+    def _say(self, sayfa, ne):
+        s = self._sayac.setdefault(sayfa, {"isabet": 0, "iska": 0, "artimli": 0, "yama": 0, "gecersiz": 0})
+        s[ne] += 1
+
+    def surum(self, sayfa):
+        return self._surum.get(sayfa, 0)
+
+    def _kayda_ekle(self, k, yeni):
+        # Yeni satırlar kayda eklenirken türetilmiş yapılar da güncellenir (ekle yoksa düşer)
+        eski, yeni = kategorileri_esle(k["df"].copy(deep=False), yeni)
+        k["df"] = pd.concat([eski, yeni])
+        for ad, t in list(k["turev"].items()):
+            if t["ekle"] is None: del k["turev"][ad]
+            else: t["ekle"](t["yapi"], yeni)
+
+    def _guncel(self, sayfa, kolonlar, zorla=False):
+        # zorla: süre dolmamış olsa da kaynağa bak (ekleme sayfalarında yine artımlı)
+        with self._kilit:
+            k = self._kayit.get(sayfa)
+            if k is not None and not zorla and time.time() - k["zaman"] < self.ttl:
+                self._say(sayfa, "isabet")
+                return k
+        zaman = time.time()
+        if k is not None and sayfa in self.ekleme_sayfalari and zaman - k["tam"] < self.tam_okuma:
+            n = len(k["df"])
+            yeni = cerceve_kur(self.motor.oku(sayfa, baslangic=n), kolonlar, baslangic=n, sayfa=sayfa)
+            with self._kilit:
+                if self._kayit.get(sayfa) is k and len(k["df"]) == n: # arada yama gelmediyse
+                    if len(yeni):
+                        self._kayda_ekle(k, yeni)
+                        self._surum[sayfa] = self.surum(sayfa) + 1
+                    k["zaman"] = zaman
+                self._say(sayfa, "artimli")
+                return k
+        df = cerceve_kur(self.motor.oku(sayfa), kolonlar, sayfa=sayfa)
+        with self._kilit:
+            self._say(sayfa, "iska")
+            k = self._kayit[sayfa] = {"df": df, "kolonlar": list(kolonlar), "zaman": zaman, "tam": zaman, "turev": {}}
+            self._surum[sayfa] = self.surum(sayfa) + 1
+        return k
+
+    def al(self, sayfa, kolonlar):
+        return self._guncel(sayfa, kolonlar)["df"].copy()
+
+    def turet(self, sayfa, kolonlar, ad, kur, ekle=None, kopya=None):
+        # Sayfanın güncel hali üzerine bir kere kurulan yapı (indeks, özet...). Yeni satırlar
+        # gelince ekle(yapi, yeni_satirlar) ile yerinde güncellenir; kayıt değişirse baştan kurulur.
+        # Yapı arka plan gönderimlerinde de güncellendiği için kopya(yapi) verilirse kilit altında
+        # alınan kopya döner: dönen DataFrame ile tutarlıdır, okunurken değişmez.
+        # Dönen DataFrame önbelleğin kendisidir, değiştirilmemeli.
+        k = self._guncel(sayfa, kolonlar)
+        with self._kilit:
+            t = k["turev"].get(ad)
+            if t is None: t = k["turev"][ad] = {"yapi": kur(k["df"]), "ekle": ekle}
+            return (t["yapi"] if kopya is None else kopya(t["yapi"])), k["df"]
+
+    def son(self, sayfa, kolonlar, n):
+        # Son n satır. Sayfanın tamamı önbellekteyse oradan, değilse sadece kuyruk okunur.
+        if sayfa in self._kayit: return self._guncel(sayfa, kolonlar)["df"].tail(n).copy()
+        with self._kilit:
+            k = self._son.get((sayfa, n))
+            if k is not None and time.time() - k["zaman"] < self.ttl:
+                self._say(sayfa, "isabet")
+                return k["df"].tail(n).copy()
+            self._say(sayfa, "iska")
+        zaman = time.time()
+        bas = max(self.motor.satir_sayisi(sayfa) - n, 0)
+        df = cerceve_kur(self.motor.oku(sayfa, baslangic=bas), kolonlar, baslangic=bas, sayfa=sayfa)
+        with self._kilit:
+            if k is None or not k["df"].equals(df): self._surum[sayfa] = self.surum(sayfa) + 1
+            self._son[(sayfa, n)] = {"df": df, "zaman": zaman}
+        return df.copy()
+
+    def surumlu(self, ad, anahtar, kur):
+        # Birden fazla sayfadan türeyen görünümler: anahtar (sayfa sürümleri) değişmedikçe yeniden kurulmaz
+        with self._kilit:
+            g = self._gorunum.get(ad)
+            if g is not None and g[0] == anahtar: return g[1]
+        yapi = kur()
+        with self._kilit: self._gorunum[ad] = (anahtar, yapi)
+        return yapi
+
+    def _son_dusur(self, sayfa):
+        for anahtar in [a for a in self._son if a[0] == sayfa]: del self._son[anahtar]
+
+    def satir_ekle(self, sayfa, satirlar, poz):
+        # poz: motorun bildirdiği, eklenen ilk satırın pozisyonu. Yama sadece satırlar tam kaydın
+        # sonuna geldiyse yapılır. Arada başkası eklediyse ya da kayıt satırları zaten okuduysa
+        # ekleme sayfasında kayıt bayat sayılır (sonraki okuma eksiği artımlı çeker), diğerlerinde düşer.
+        with self._kilit:
+            k = self._kayit.get(sayfa)
+            self._surum[sayfa] = self.surum(sayfa) + 1
+            self._son_dusur(sayfa)
+            if k is None: return
+            if poz is None or poz != len(k["df"]):
+                if sayfa in self.ekleme_sayfalari: k["zaman"] = 0
+                else: del self._kayit[sayfa]
+                self._say(sayfa, "gecersiz")
+                return
+            ek = cerceve_kur(satirlar, k["kolonlar"], baslangic=poz, sayfa=sayfa)
+            self._kayda_ekle(k, ek)
+            self._say(sayfa, "yama")
+
+    def yaz(self, sayfa, df):
+        # save_data sonrası sayfanın bilinen yeni hali
+        with self._kilit:
+            k = self._kayit.get(sayfa)
+            self._surum[sayfa] = self.surum(sayfa) + 1
+            self._son_dusur(sayfa)
+            if k is None: return
+            k["df"] = tiple(df.reset_index(drop=True), sayfa)
+            k["turev"] = {}
+            self._say(sayfa, "yama")
+
+    def satir_yaz(self, sayfa, poz, satir):
+        # Tek satırlık bilinen değişiklik (koşullu güncelleme sonrası)
+        with self._kilit:
+            k = self._kayit.get(sayfa)
+            self._surum[sayfa] = self.surum(sayfa) + 1
+            self._son_dusur(sayfa)
+            if k is None: return
+            yeni = cerceve_kur([satir], k["kolonlar"], baslangic=poz, sayfa=sayfa)
+            if poz >= len(k["df"]) or k["df"].iat[poz, 0] != yeni.iat[0, 0]:
+                del self._kayit[sayfa]; self._say(sayfa, "gecersiz")
+                return
+            df, yeni = kategorileri_esle(k["df"].copy(), yeni)
+            for c in df.columns: df.at[poz, c] = yeni.at[poz, c]
+            k["df"], k["turev"] = df, {}
+            self._say(sayfa, "yama")
+
+    def hucre_yaz(self, sayfa, hucreler):
+        # [(poz, sütun no, değer)] hücrelerinin bilinen yeni değerleri
+        with self._kilit:
+            k = self._kayit.get(sayfa)
+            self._surum[sayfa] = self.surum(sayfa) + 1
+            self._son_dusur(sayfa)
+            if k is None: return
+            df = k["df"].copy()
+            for kol in {kol for _, kol, _ in hucreler}: df.isetitem(kol, df.iloc[:, kol].astype(object))
+            for p, kol, v in hucreler:
+                if p >= len(df): del self._kayit[sayfa]; self._say(sayfa, "gecersiz"); return
+                df.iat[p, kol] = v
+            k["df"], k["turev"] = tiple(df, sayfa), {}
+            self._say(sayfa, "yama")
+
+    def tazele(self, sayfa, kolonlar):
+        # Değiştiği bilinen sayfayı süre dolmasını beklemeden okur (ekleme sayfalarında artımlı).
+        # Baştan okunan içerik aynı çıkarsa kayıt ve türetilmiş yapılar korunur. Sürüm değiştiyse True.
+        with self._kilit:
+            k, once = self._kayit.get(sayfa), self.surum(sayfa)
+            if k is None:
+                # Sadece kuyruğu okunmuş sayfa: bir sonraki son() yeniden okusun
+                if not any(a[0] == sayfa for a in self._son): return False
+                self._son_dusur(sayfa); self._surum[sayfa] = once + 1
+                return True
+        zaman = time.time()
+        if sayfa in self.ekleme_sayfalari and zaman - k["tam"] < self.tam_okuma:
+            self._guncel(sayfa, kolonlar, zorla=True)
+            return self.surum(sayfa) != once
+        df = cerceve_kur(self.motor.oku(sayfa), kolonlar, sayfa=sayfa)
+        with self._kilit:
+            if self._kayit.get(sayfa) is k and len(df) == len(k["df"]) and \
+                    (df[kolonlar].astype(str).values == k["df"][kolonlar].astype(str).values).all():
+                k["zaman"] = k["tam"] = zaman
+                return False
+            self._kayit[sayfa] = {"df": df, "kolonlar": list(kolonlar), "zaman": zaman, "tam": zaman, "turev": {}}
+            self._surum[sayfa] = self.surum(sayfa) + 1
+            self._say(sayfa, "iska")
+        return True
+
+    def gecersiz_kil(self, sayfa):
+        with self._kilit:
+            if self._kayit.pop(sayfa, None) is not None: self._say(sayfa, "gecersiz")
+            self._son_dusur(sayfa)
+            self._surum[sayfa] = self.surum(sayfa) + 1
+
+    def temizle(self):
+        for sayfa in set(self._kayit) | {a[0] for a in self._son}: self.gecersiz_kil(sayfa)
+
+    def sayaclar(self):
+        with self._kilit: return {s: dict(v) for s, v in self._sayac.items()}
+
+# --- PAYLAŞILAN VERİ SERVİSİ ---
+class VeriServisi:
+    # Süreç başına tek servis. Arka planda `aralik` saniyede bir motorun ucuz revizyon bilgisine
+    # bakar (surumler: Sheets'te tek Drive isteği, SQLite'ta sayaç tablosu); sadece revizyonu
+    # değişen sayfaları önbellekte tazeler. nesil önbellekteki sayfa sürümlerinin toplamıdır: dışarıdan
+    # gelen değişiklikler de, bu süreçteki yazmaların yamaları da onu artırır. Oturumlar nesil'i
+    # izleyip yeniden çizer: açık oturum sayısı okuma trafiğini değiştirmez.
+    def __init__(self, onbellek, sayfalar, aralik=10):
+        self.onbellek = onbellek
+        self.sayfalar = dict(sayfalar)
+        self.aralik = aralik
+        self.son_kontrol = None
+        self._surumler = None
+        self._sayac = {"kontrol": 0, "degisiklik": 0, "hata": 0}
+        self._kilit = threading.Lock()
+        threading.Thread(target=self._dongu, daemon=True).start()
+
+    def kontrol(self):
+        # Revizyonu değişen sayfaları tazeler; ilk turda (karşılaştıracak revizyon yok) hepsine bakar.
+        # Tazelenemeyen sayfanın revizyonu saklanmaz: sonraki tur sadece onu tekrar dener.
+        with self._kilit:
+            surumler = dict(self.onbellek.motor.surumler())
+            eski = self._surumler or {}
+            degisti = False
+            for sayfa, kolonlar in self.sayfalar.items():
+                if sayfa in eski and surumler.get(sayfa) == eski[sayfa]: continue
+                try: degisti |= self.onbellek.tazele(sayfa, kolonlar)
+                except Exception:
+                    surumler.pop(sayfa, None)
+                    self._sayac["hata"] += 1
+            self._surumler = surumler
+            self._sayac["kontrol"] += 1
+            self.son_kontrol = time.time()
+            if degisti: self._sayac["degisiklik"] += 1
+            return degisti
+
+    @property
+    def nesil(self):
+        return sum(self.onbellek.surum(s) for s in self.sayfalar)
+
+    def sayaclar(self):
+        return dict(self._sayac, nesil=self.nesil)
+
+    def _dongu(self):
+        while True:
+            time.sleep(self.aralik)
+            try: self.kontrol()
+            except: self._sayac["hata"] += 1 # surumler alınamadı; saklı revizyonlar geçerli
+
+# --- ÖĞRENCİ İNDEKSİ ---
+def ogrenci_indeksi(maske=None):
+    # Ogrenci -> satır etiketleri (sayfa sırasıyla). VeriOnbellek.turet için (kur, ekle, kopya) döner;
+    # maske verilirse sadece maske(df) True olan satırlar indekslenir (örn. Tip == "Gelir").
+    def ekle(indeks, df):
+        alt = df if maske is None else df[maske(df)]
+        for ad, etiketler in alt.groupby("Ogrenci", sort=False, observed=True).groups.items():
+            indeks.setdefault(ad, []).extend(etiketler)
+    def kur(df):
+        indeks = {}; ekle(indeks, df)
+        return indeks
+    def kopya(indeks):
+        return {ad: list(etiketler) for ad, etiketler in indeks.items()}
+    return kur, ekle, kopya
+
+# --- GEÇMİŞ ZAMAN ÇİZELGESİ ---
+TIP_STIL = {"Ders": ("t-lesson", "🎾"), "Para": ("t-money", "💰"), "Gider": ("t-sys", "📉"), "Ziyaret": ("t-sys", "👀")}
+
+def zaman_sirala(df):
+    # En yeni üstte; aynı Zaman'da (örn. sadece tarihi olan finans kayıtları) sonra eklenen önce gelir
+    return df.iloc[::-1].sort_values("Zaman", ascending=False, kind="stable", na_position="last").reset_index(drop=True)
+
+def zaman_cizelgesi_kur(logs, fins, ziyaret):
+    # Ders, finans ve ziyaret özetlerini Zaman'a göre tek akışta birleştirir (en yeni üstte), Tip'i
+    # Ders/Para/Gider/Ziyaret olarak işaretler ve her satırın HTML'ini bir kerede hazırlar.
+    parcalar = [logs.assign(Tip="Ders")]
+    if not fins.empty:
+        parcalar.append(pd.DataFrame({
+            "Tarih": fins["Tarih"], "Saat": "-", "Ogrenci": fins["Ogrenci"],
+            "Islem": "Finans: " + fins["Tip"].astype(str),
+            "Detay": fins["Tutar"].map("{:,.0f} TL".format) + " - " + fins["Not"].fillna("").astype(str),
+            "Tip": fins["Tip"].eq("Gelir").map({True: "Para", False: "Gider"}), "Zaman": fins["Zaman"]}))
+    if not ziyaret.empty:
+        ozet = ziyaret.groupby(["Tarih", "Saat"], sort=False, observed=True, as_index=False).agg(Ziyaret=("Ziyaret", "sum"), Zaman=("Zaman", "first"))
+        parcalar.append(pd.DataFrame({
+            "Tarih": ozet["Tarih"], "Saat": ozet["Saat"], "Ogrenci": "Misafir", "Islem": "Giriş",
+            "Detay": ozet["Ziyaret"].map("{:,.0f} ziyaret".format), "Tip": "Ziyaret", "Zaman": ozet["Zaman"]}))
+    df = pd.concat(parcalar, ignore_index=True)
+    df.loc[df["Ogrenci"] == "Misafir", "Tip"] = "Ziyaret"
+    df = zaman_sirala(df)
+    css = df["Tip"].map({t: s[0] for t, s in TIP_STIL.items()}).fillna("t-lesson")
+    icon = df["Tip"].map({t: s[1] for t, s in TIP_STIL.items()}).fillna("🎾")
+    metin = lambda k: df[k].astype("string").fillna("")
+    df["html"] = ('<div class="timeline-item ' + css + '"><span class="time-badge">' + metin("Tarih") + " " + metin("Saat")
+                  + '</span><div class="log-title">' + icon + " " + metin("Ogrenci") + " - " + metin("Islem")
+                  + '</div><div class="log-detail">' + metin("Detay") + "</div></div>")
+    return df
+
+# --- KASA ÖZETİ ---
+def kasa_ozeti():
+    # Tip, (Ay, Tip) ve Ogrenci (sadece Gelir) başına tutar toplamları. VeriOnbellek.turet için
+    # (kur, ekle, kopya): Finans_Kasa'ya eklenen satırlar toplamlara eklenir, baştan hesaplanmaz.
+    def ekle(ozet, df):
+        for ad, kolonlar, alt in (("tip", "Tip", df), ("ay", ["Ay", "Tip"], df), ("ogrenci", "Ogrenci", df[df["Tip"] == "Gelir"])):
+            for k, v in alt.groupby(kolonlar, sort=False, observed=True)["Tutar"].sum().items():
+                ozet[ad][k] = ozet[ad].get(k, 0) + v
+    def kur(df):
+        ozet = {"tip": {}, "ay": {}, "ogrenci": {}}; ekle(ozet, df)
+        return ozet
+    def kopya(ozet):
+        return {ad: dict(toplamlar) for ad, toplamlar in ozet.items()}
+    return kur, ekle, kopya